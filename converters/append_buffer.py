@@ -0,0 +1,58 @@
+"""
+Buffer of the values of the mappings with FLAG_APPEND_LIST.
+
+Every appended value used to read the list at its path, append to it, run the rest of the flag
+transforms on the whole list and write it back, so a list of n values was read, formatted and
+written n times. The values are kept per path instead while a mapping runs, and flushed after
+it: every list is read, extended and written once, and the transforms after the append run once
+on the whole list.
+"""
+
+# Returned by the append transform, the value is in the buffer and the transforms stop there
+APPENDED = object()
+
+
+class AppendBuffer:
+    def __init__(self):
+        # path -> the values appended to it, the paths in the order they were first appended to
+        self.values = {}
+        # path -> the arguments of the last append, passed on to the transforms after the append
+        self.args = {}
+        # The paths whose lists are written even if they end up empty
+        self.always = set()
+
+    def __bool__(self):
+        return bool(self.values)
+
+    def append(self, path, value, *args):
+        self.values.setdefault(path, []).append(value)
+        self.args[path] = args
+
+    def write_always(self, path):
+        """
+        Write the list of path even if the transforms after the append leave it empty
+        """
+        self.always.add(path)
+
+    def flush(self):
+        """
+        Yield (path, values, args, write always) of every path, and empty the buffer
+        """
+        values, args, always = self.values, self.args, self.always
+        self.values, self.args, self.always = {}, {}, set()
+        for path, path_values in values.items():
+            yield path, path_values, args[path], path in always
+
+    @staticmethod
+    def extend(cur_list, values):
+        """
+        Return cur_list, the value that is at the path, with the values appended to it
+        """
+        # If it doesn't exist, create it
+        if not cur_list:
+            return list(values)
+        # This means a value exists in the path, so convert it to a list
+        if not isinstance(cur_list, list):
+            cur_list = [cur_list]
+        cur_list.extend(values)
+        return cur_list
@@ -0,0 +1,249 @@
+"""
+Conversion session for embedding SolCon in other programs.
+
+A Converter is built once from the configs and can then convert any number of VNFs, without
+parsing arguments, touching the disk or setting up logging:
+
+    converter = Converter("config/config-esc.toml")
+    sol6_vnfd = converter.convert_tosca(yaml.safe_load(tosca_file))
+    sol1_vnfd = converter.convert_sol6(json.load(sol6_file))
+"""
+import hashlib
+import json
+import logging
+import toml
+from converters.sol6_converter import Sol6Converter
+from converters.sol6_converter_cisco import SOL6ConverterCisco
+from converters.sol1_converter import Sol1Converter
+from keys.sol6_keys import PathMapping
+from sol6_config_default import SOL6ConfigDefault
+from utils.dict_utils import get_path_value, merge_two_dicts, remove_empty_from_dict
+from utils.profiler import NO_PROFILER
+from utils.json_backend import JsonBackend
+from utils.yaml_backend import YamlBackend
+log = logging.getLogger(__name__)
+
+
+class Converter:
+    supported_providers = {
+        "cisco": SOL6ConverterCisco,
+        "mavenir": SOL6ConverterCisco
+    }
+    # Used when the provider of the VNF isn't one of the supported ones
+    default_provider = "cisco"
+
+    def __init__(self, tosca_config, sol6_config=None, prune=True, config_cache=None):
+        """
+        :param tosca_config: The TOSCA paths config, as the path of a TOML file or as an already loaded dict
+        :param sol6_config: The SOL6 paths config, same as tosca_config. Uses the built-in config if not given
+        :param prune: Remove the empty values from the converted VNFDs
+        :param config_cache: A ConfigCache to load the compiled configs from, instead of parsing them
+        """
+        tosca_text = self.read_config(tosca_config)
+        sol6_text = SOL6ConfigDefault.config if sol6_config is None else self.read_config(sol6_config)
+        # Identifies the configs for the result cache
+        self.config_digest = self.digest_config(tosca_text, sol6_text)
+        self.variables = self.compile_config(tosca_text, sol6_text, config_cache)
+        self.prune = prune
+        # Converter class -> the MappingPlan its conversions share
+        self.mapping_plans = {}
+
+    @classmethod
+    def compile_config(cls, tosca_text, sol6_text, config_cache=None):
+        """
+        Merge the configs and resolve all of their paths.
+        If a config_cache is given the result is stored there and reused until the TOML files change.
+        :param tosca_text: The TOML text of the TOSCA config, or the already loaded dict
+        :param sol6_text: The TOML text of the SOL6 config, or the already loaded dict
+        """
+        # Configs that are passed in as dicts are already parsed, so there is nothing worth caching
+        key = None
+        if config_cache and isinstance(tosca_text, str) and isinstance(sol6_text, str):
+            key = config_cache.key(tosca_text, sol6_text)
+            variables = config_cache.load(key)
+            if variables is not None:
+                return variables
+
+        variables = merge_two_dicts(cls.load_config(tosca_text), cls.load_config(sol6_text))
+        # Resolve the full paths once here, instead of in every conversion
+        variables = PathMapping.format_paths(variables)
+
+        if key:
+            config_cache.store(key, variables)
+        return variables
+
+    @staticmethod
+    def read_config(config):
+        """
+        Read the TOML text of a config file, configs that are already dicts are returned as they are
+        """
+        if isinstance(config, dict):
+            return config
+        with open(config) as f:
+            return f.read()
+
+    @staticmethod
+    def digest_config(*configs):
+        h = hashlib.sha256()
+        for config in configs:
+            if isinstance(config, dict):
+                config = json.dumps(config, sort_keys=True, default=str)
+            h.update(config.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    @staticmethod
+    def load_config(config):
+        if isinstance(config, dict):
+            return config
+        return toml.loads(config)
+
+    def convert_tosca(self, tosca_vnf, provider=None, profiler=NO_PROFILER):
+        """
+        Convert a parsed TOSCA (SOL001) VNF to a SOL006 VNFD.
+        The tosca_vnf dict is modified during the conversion, pass in a copy if it is needed afterwards.
+        :param provider: Use this provider instead of reading it from the VNF
+        :param profiler: A Profiler to record the time and memory of the conversion phases in
+        :return: The dict to place under 'etsi-nfv-descriptors:nfv'
+        """
+        if provider:
+            provider = provider.lower()
+        else:
+            provider = self.find_provider(tosca_vnf)
+        return self._convert_tosca(tosca_vnf, provider, profiler)
+
+    def convert_tosca_template(self, template, input_values, provider=None, profiler=NO_PROFILER):
+        """
+        Convert a TOSCA template with a set of input values, to convert the same VNF for many sites.
+        The conversion gets a copy of the template that is made in the same walk that replaces its
+        inputs, so the template is parsed and indexed once and never modified.
+        :param template: The utils.input_index.InputIndex of the parsed TOSCA, reused for every set of
+        input values
+        :param input_values: {input name: value}, these take precedence over the input_values of the config
+        :param provider: Use this provider instead of reading it from the VNF
+        """
+        if provider:
+            provider = provider.lower()
+        else:
+            provider = self.find_provider(template.dict_tosca)
+
+        config_values = self.variables["tosca"].get("input_values") or {}
+        with profiler.phase("convert_variables"):
+            tosca_vnf, input_index = template.specialize(merge_two_dicts(config_values, input_values))
+        return self._convert_tosca(tosca_vnf, provider, profiler, input_index=input_index)
+
+    def _convert_tosca(self, tosca_vnf, provider, profiler, input_index=None):
+        log.info("Starting conversion with provider '{}'".format(provider))
+
+        converter_cls = self.supported_providers[provider]
+        converter = converter_cls(tosca_vnf, {}, variables=self.variables,
+                                  mapping_plan=self._mapping_plan(converter_cls), profiler=profiler)
+        converter.input_index = input_index
+        # Try to convert variables to their actual values
+        with profiler.phase("convert_variables"):
+            converter.convert_variables()
+
+        return self._prune(converter.convert(provider=provider), profiler)
+
+    def convert_sol6(self, sol6_vnf, profiler=NO_PROFILER):
+        """
+        Convert a parsed SOL006 VNFD (with the 'data' and 'etsi-nfv-descriptors:nfv' tags) to SOL001.
+        The sol6_vnf dict is modified during the conversion, pass in a copy if it is needed afterwards.
+        """
+        converter = Sol1Converter(sol6_vnf, {}, self.variables,
+                                  mapping_plan=self._mapping_plan(Sol1Converter), profiler=profiler)
+        return self._prune(converter.convert(), profiler)
+
+    def convert_data(self, data, is_yaml, provider=None, result_cache=None, yaml_backend=None,
+                     json_backend=None):
+        """
+        Convert the raw bytes of a TOSCA YAML (is_yaml) to SOL6 JSON, or of a SOL6 JSON to SOL1 YAML.
+        If a result_cache is given, inputs that were converted before are returned from it without
+        parsing or converting anything.
+        :param provider: Use this provider instead of reading it from the VNF
+        :param yaml_backend: The YamlBackend to read and write YAML with, the default one if not given
+        :param json_backend: The JsonBackend to write JSON with, the default one if not given
+        :return: The output text
+        """
+        yaml_backend = yaml_backend if yaml_backend else YamlBackend()
+        json_backend = json_backend if json_backend else JsonBackend()
+        provider = provider.lower() if provider else None
+
+        key = None
+        if result_cache:
+            output_format = "yaml" if not is_yaml else json_backend
+            key = self.result_key(result_cache, data, is_yaml, provider, output_format)
+            cached = result_cache.load(key)
+            if cached is not None:
+                return cached.decode("utf-8")
+
+        if is_yaml:
+            tosca_vnf = yaml_backend.load(data)
+            if not provider:
+                provider = self.find_provider(tosca_vnf, data)
+            output = json_backend.dumps({'data': {'etsi-nfv-descriptors:nfv':
+                                                  self.convert_tosca(tosca_vnf, provider)}})
+        else:
+            output = yaml_backend.dump(self.convert_sol6(json.loads(data)), default_flow_style=False)
+
+        if key:
+            result_cache.store(key, output.encode("utf-8"))
+        return output
+
+    def result_key(self, result_cache, data, is_yaml, provider, output_format):
+        """
+        The result_cache key of converting data with this session
+        :param is_yaml: The direction of the conversion, the same data can be read as TOSCA or SOL6
+        :param output_format: 'yaml', or the JsonBackend the output is written with
+        """
+        if isinstance(output_format, JsonBackend):
+            output_format = "json-{}{}".format(output_format.name, "-compact" if output_format.compact else "")
+        output_format = "{}-to-{}".format("tosca" if is_yaml else "sol6", output_format)
+        return result_cache.key(data, self.config_digest, provider, self.prune, output_format)
+
+    def find_provider(self, tosca_vnf, tosca_data=None):
+        """
+        Read the provider from the 'vnf_provider' path of the TOSCA config.
+        If it isn't there and the raw tosca_data is given, fall back to scanning that for the provider.
+        """
+        path = PathMapping.get_full_path("vnf_provider", self.variables["tosca"])
+        provider = get_path_value(path, tosca_vnf, must_exist=False, no_msg=True)
+        if not provider:
+            if not tosca_data:
+                raise ValueError("Provider not found")
+            provider = Sol6Converter.find_provider(tosca_data)
+
+        return self.match_provider("-".join(str(provider).lower().split(" ")), self.supported_providers)
+
+    @classmethod
+    def match_provider(cls, sel_provider, valid_providers):
+        """
+        If the provider is not a part of a valid provider, i.e. 'cisco' in ['cisco'],
+        check if any of the valid providers are in the sel_provider,
+          i.e. 'cisco' in '&provider-cisco'
+        """
+        if sel_provider in valid_providers:
+            return sel_provider
+
+        for s_p in valid_providers:
+            if s_p in sel_provider:
+                return s_p
+        # No supported provider was found, try running it with the default one to see if it works, since
+        # the config files might have been edited
+        log.error("Unsupported provider: '{}', running with default provider '{}'. THIS WILL PROBABLY FAIL."
+                  .format(sel_provider, cls.default_provider))
+        return cls.default_provider
+
+    def _mapping_plan(self, converter_cls):
+        # The plan only depends on the configs, so it is shared by all the conversions of this session
+        if converter_cls not in self.mapping_plans:
+            self.mapping_plans[converter_cls] = converter_cls.new_mapping_plan()
+        return self.mapping_plans[converter_cls]
+
+    def _prune(self, cnfv, profiler=NO_PROFILER):
+        if self.prune:
+            # Not pruned in place, the VNFD can reference the same value from several places and
+            # the YAML output would turn those into anchors
+            with profiler.phase("prune"):
+                return remove_empty_from_dict(cnfv)
+        return cnfv
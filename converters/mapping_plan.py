@@ -0,0 +1,136 @@
+"""
+Compiled, config dependent part of the mappings.
+
+The mapping lists are built per VNF, since the MapElems depend on the document, but the paths and
+flags of the entries only depend on the configs. Every distinct (path, flags, path) entry is
+compiled once into a PlanEntry with the paths compiled and the flags resolved to a bitmask, and
+the plan is kept by the Converter session so the next conversions reuse it.
+The entries with FLAG_KEY_SET_VALUE aren't kept, one of their paths is a value that can come from
+the document, i.e. the VNF id, so the plan would grow with every VNF the session converts.
+
+The value transforms of the flags are compiled the same way, every distinct mask gets the list of
+only the transforms its flags turn on.
+"""
+from collections import namedtuple
+from utils.dict_utils import compile_path
+
+PlanEntry = namedtuple("PlanEntry", ["source_path", "sol6_path", "mask"])
+
+
+class MappingPlan:
+    def __init__(self, flag_attrs, sticky_flag_attrs=(), flag_transforms=()):
+        """
+        :param flag_attrs: ((flag constant name, attribute name), ...) of the class holding the flags,
+        the attribute is True while a mapping with that flag is run
+        :param sticky_flag_attrs: Attributes that stay True for the later mappings once they are set
+        :param flag_transforms: ((attribute name, method name), ...) of the value transforms in the
+        order they run, the method runs when the attribute is True, or always if the attribute is None
+        """
+        # Bit i of a mask is attrs[i]
+        self.flag_names = tuple(name for name, _ in flag_attrs)
+        self.attrs = tuple(attr for _, attr in flag_attrs)
+        self.sticky_mask = 0
+        for i, attr in enumerate(self.attrs):
+            if attr in sticky_flag_attrs:
+                self.sticky_mask |= 1 << i
+        # The entries with these flags are compiled every time instead of being kept
+        self.uncached_mask = 0
+        for i, name in enumerate(self.flag_names):
+            if name == "FLAG_KEY_SET_VALUE":
+                self.uncached_mask |= 1 << i
+
+        # keys class -> {flag value: bit}
+        self._flag_bits = {}
+        self._entries = {}
+
+        self.flag_transforms = flag_transforms
+        # mask -> the names of the transforms that run for it
+        self._transforms = {}
+
+    def entry(self, keys, source_path, flags, map_sol6):
+        """
+        Return the PlanEntry for a mapping, compiling it the first time it is seen, or every time
+        for the entries with FLAG_KEY_SET_VALUE
+        :param keys: The keys (V2MapBase) instance or class that defines the flag values
+        :param map_sol6: The sol6 part of the mapping, a path or [path, [MapElem]]
+        """
+        sol6_path = map_sol6[0] if isinstance(map_sol6, list) else map_sol6
+        key = (source_path, flags, sol6_path)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = PlanEntry(_compile(source_path), _compile(sol6_path), self.mask(flags, keys))
+            if not entry.mask & self.uncached_mask:
+                self._entries[key] = entry
+        return entry
+
+    def mask(self, flags, keys):
+        """
+        Resolve a flag or a tuple of flags to their bitmask, flags without an attribute are ignored
+        """
+        keys_cls = keys if isinstance(keys, type) else type(keys)
+        flag_bits = self._flag_bits.get(keys_cls)
+        if flag_bits is None:
+            flag_bits = {getattr(keys_cls, name): 1 << i for i, name in enumerate(self.flag_names)}
+            self._flag_bits[keys_cls] = flag_bits
+
+        if not isinstance(flags, tuple):
+            flags = (flags,)
+        mask = 0
+        for flag in flags:
+            mask |= flag_bits.get(flag, 0)
+        return mask
+
+    def apply(self, holder, mask):
+        """
+        Set the flag attributes of holder to the mask, only the attributes that change are touched.
+        holder.flag_mask has to hold the current mask, starting at 0 with all the attributes False.
+        """
+        mask |= holder.flag_mask & self.sticky_mask
+        changed = mask ^ holder.flag_mask
+        i = 0
+        while changed:
+            if changed & 1:
+                setattr(holder, self.attrs[i], bool(mask >> i & 1))
+            changed >>= 1
+            i += 1
+        holder.flag_mask = mask
+
+    def transforms(self, mask):
+        """
+        Return the names of the transform methods that run for the mask, in order
+        """
+        names = self._transforms.get(mask)
+        if names is None:
+            bits = {attr: 1 << i for i, attr in enumerate(self.attrs)}
+            names = tuple(name for attr, name in self.flag_transforms
+                          if attr is None or mask & bits.get(attr, 0))
+            self._transforms[mask] = names
+        return names
+
+    def pipeline(self, holder):
+        """
+        Return the bound transform methods of holder for its current flag_mask, in order.
+        holder.flag_pipelines keeps them, so every mask is only bound once per holder.
+        """
+        pipeline = holder.flag_pipelines.get(holder.flag_mask)
+        if pipeline is None:
+            pipeline = tuple(getattr(holder, name) for name in self.transforms(holder.flag_mask))
+            holder.flag_pipelines[holder.flag_mask] = pipeline
+        return pipeline
+
+    def pipeline_after(self, holder, name):
+        """
+        Return the bound transforms of holder for its current flag_mask that run after the transform
+        name, or () if name doesn't run for it
+        """
+        names = self.transforms(holder.flag_mask)
+        if name not in names:
+            return ()
+        return self.pipeline(holder)[names.index(name) + 1:]
+
+
+def _compile(path):
+    # None paths are passed through as they are
+    if isinstance(path, str):
+        return compile_path(path)
+    return path
@@ -2,30 +2,40 @@ from keys.sol6_keys import *
 from converters.sol1_flags import *
 from keys.sol6_keys import V2MapBase
 from mapping_v2 import *
+from utils.profiler import NO_PROFILER
 import logging
 log = logging.getLogger(__name__)
 
 
 class Sol1Converter:
 
-    def __init__(self, sol6_vnf, parsed_dict, variables):
+    def __init__(self, sol6_vnf, parsed_dict, variables, mapping_plan=None, profiler=NO_PROFILER):
+        """
+        :param mapping_plan: A MappingPlan from new_mapping_plan to reuse, a new one is made if not given
+        :param profiler: A Profiler to record the conversion phases in
+        """
         self.sol6_vnfd = sol6_vnf["data"]["etsi-nfv-descriptors:nfv"]
         self.parsed_dict = parsed_dict
         self.sol1_vnfd = {}
-        self.variables = variables
-        formatted_vars = PathMapping.format_paths(self.variables)
+        self.variables = PathMapping.format_paths(variables)
 
-        self.va_t = formatted_vars["tosca"]
-        self.va_s = formatted_vars["sol6"]
+        self.va_t = self.variables["tosca"]
+        self.va_s = self.variables["sol6"]
         self.mapping = []
         self.v2_map = V2Mapping(self.sol1_vnfd, self.sol6_vnfd)
-        self.sol1_flags = Sol1Flags(self.sol1_vnfd, self.sol6_vnfd, variables)
+        self.mapping_plan = mapping_plan if mapping_plan else self.new_mapping_plan()
+        self.sol1_flags = Sol1Flags(self.sol1_vnfd, self.sol6_vnfd, self.variables, self.mapping_plan)
+        self.profiler = profiler
 
         self.type_prefix = get_path_value(self.get_sol6_value("vnfd_id"), self.sol6_vnfd, must_exist=True)
         self.type_vnf = "{}_VNF".format(self.type_prefix)
         self.type_vdu = "{}_VDU_Compute".format(self.type_prefix)
         self.type_cp = "{}_VDU_CP".format(self.type_prefix)
 
+    @staticmethod
+    def new_mapping_plan():
+        return Sol1Flags.new_mapping_plan()
+
     def convert(self):
         tv = self.get_tosca_value
         sv = self.get_sol6_value
@@ -204,7 +214,8 @@ class Sol1Converter:
 
         # -- End Virtual Compute/Flavor
 
-        self.run_mapping()
+        with self.profiler.phase("run_mapping"):
+            self.run_mapping()
         return vnfd
 
     # *************************
@@ -216,16 +227,15 @@ class Sol1Converter:
         If there are multiple flags, they will be grouped in a tuple as well
         """
         for ((sol1_path, flags), map_sol6) in self.mapping:
-            self.run_mapping_flags(flags, V2MapBase)
-            self.run_mapping_map_needed(sol1_path, map_sol6)
-
-    def run_mapping_flags(self, flags, flag_consts: V2MapBase):
-        """
-        Handle various flag operations, such as setting them to false and updating their values
-        Called from run_mapping
-        """
-        self.sol1_flags.set_flags_false()
-        self.sol1_flags.set_flags_loop(flags, flag_consts)
+            # The paths and flags only depend on the configs, so they are compiled once in the plan
+            entry = self.mapping_plan.entry(V2MapBase, sol1_path, flags, map_sol6)
+            self.mapping_plan.apply(self.sol1_flags, entry.mask)
+            if isinstance(map_sol6, list):
+                map_sol6 = [entry.sol6_path, map_sol6[1]]
+            else:
+                map_sol6 = entry.sol6_path
+            self.run_mapping_map_needed(entry.source_path, map_sol6)
+            self.sol1_flags.flush_appends()
 
     def run_mapping_map_needed(self, sol1_path, map_sol6):
         """
@@ -298,7 +308,11 @@ class Sol1Converter:
         # Handle the various flags for no mappings
         value = self.sol1_flags.handle_flags(sol6_path, sol1_path, 0)
 
-        set_path_to(sol1_path, self.sol1_vnfd, value, create_missing=True)
+        # Appended values are written by flush_appends, always like the other values here
+        if self.sol1_flags.append_list:
+            self.sol1_flags.append_buffer.write_always(sol1_path)
+        else:
+            set_path_to(sol1_path, self.sol1_vnfd, value, create_missing=True)
 
     def merge_kvp(self, sol6_path, key):
         """
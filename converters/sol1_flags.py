@@ -1,15 +1,56 @@
 from converters.sol6_converter import Sol6Converter
+from converters.mapping_plan import MappingPlan
+from converters.append_buffer import AppendBuffer, APPENDED
 from mapping_v2 import *
 import re
 from utils.key_utils import KeyUtils
 from utils.list_utils import flatten
+from utils.valid_values import valid_values
 
 
 class Sol1Flags:
-    def __init__(self,  sol1_vnfd, sol6_vnfd, variables):
+    # The flag constant of the keys -> the attribute that is set while a mapping with that flag runs
+    flag_attrs = (
+        ("FLAG_KEY_SET_VALUE",          "key_as_value"),
+        ("FLAG_ONLY_NUMBERS",           "only_number"),
+        ("FLAG_APPEND_LIST",            "append_list"),
+        ("FLAG_ONLY_NUMBERS_FLOAT",     "only_number_float"),
+        ("FLAG_LIST_FIRST",             "first_list_elem"),
+        ("FLAG_USE_VALUE",              "tosca_use_value"),
+        ("FLAG_FORMAT_IP",              "format_as_ip"),
+        ("FLAG_FAIL_SILENT",            "fail_silent"),
+        ("FLAG_REQ_PARENT",             "req_parent"),
+        ("FLAG_FORMAT_DISK_FMT",        "format_as_disk"),
+        ("FLAG_FORMAT_CONT_FMT",        "format_as_container"),
+        ("FLAG_FORMAT_AFF_SCOPE",       "format_as_aff_scope"),
+        ("FLAG_FORMAT_STORAGE_TYPE",    "format_as_storage"),
+        ("FLAG_FORMAT_INVALID_NONE",    "format_invalid_none"),
+        ("FLAG_UNIT_GB",                "unit_gb"),
+        ("FLAG_UNIT_FRACTIONAL",        "unit_fractional"),
+        ("FLAG_MIN_1",                  "min_1"),
+    )
+
+    # The value transforms of the flags in the order they run: (attribute that turns it on, method)
+    # None runs the method for every value
+    flag_transforms = (
+        ("unit_gb",                     "_flag_convert_units"),
+        ("only_number",                 "_flag_only_number"),
+        ("min_1",                       "_flag_min_1"),
+        ("append_list",                 "_flag_append_to_list"),
+        ("format_as_ip",                "_flag_format_as_ip"),
+        ("first_list_elem",             "_flag_first_list_elem"),
+        ("nth_list_elem",               "_flag_nth_list_elem"),
+        (None,                          "_flag_check_for_null"),
+    )
+
+    def __init__(self,  sol1_vnfd, sol6_vnfd, variables, mapping_plan=None):
+        """
+        :param mapping_plan: The MappingPlan the flags are applied with, a new one is made if not given
+        """
         self.sol6_vnfd = sol6_vnfd
         self.sol1_vnfd = sol1_vnfd
         self.variables = variables
+        self.mapping_plan = mapping_plan if mapping_plan else self.new_mapping_plan()
 
         # Set up the flag variables
         # We probably won't need all of these for SOL1
@@ -32,130 +73,90 @@ class Sol1Flags:
         self.unit_gb            = False
         self.unit_fractional    = False
         self.min_1              = False
+        self.flag_mask = 0
+        # flag_mask -> the bound transforms that run for it, from the mapping plan
+        self.flag_pipelines = {}
+        # The values of the mappings with FLAG_APPEND_LIST, written by flush_appends
+        self.append_buffer = AppendBuffer()
+
+    @classmethod
+    def new_mapping_plan(cls):
+        return MappingPlan(cls.flag_attrs, flag_transforms=cls.flag_transforms)
 
     # ******************
     # ** Flag methods **
     # ******************
     def handle_flags(self, f_sol6_path, f_sol1_path, run):
         """
-        Returns the value after being formatted by the flags
+        Returns the value after being formatted by the flags, or None if it was appended to a list
+        Only the transforms of the flags that are set are run, see flag_transforms
+        The disk, container, affinity scope and storage formats aren't used for SOL1
         """
-
         value = self._key_as_value(self.key_as_value, f_sol6_path)
-        value = self._convert_units(self.unit_gb, "GB", value, is_float=self.unit_fractional)
-        value = self._only_number(self.only_number, value, is_float=self.only_number_float)
-        value = self._min_1(self.min_1, value)
-        value = self._append_to_list(self.append_list, f_sol1_path, value)
-        value = self._format_as_valid(self.format_as_ip, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_PROTOCOLS_VAL"],
-                                      none_found=self.format_invalid_none, fuzzy=True)
-        # value = self._format_as_valid(self.format_as_disk, f_sol6_path, value,
-        #                               self.variables["sol6"]["VALID_DISK_FORMATS_VAL"],
-        #                               none_found=self.format_invalid_none)
-        # value = self._format_as_valid(self.format_as_container, f_sol6_path, value,
-        #                               self.variables["sol6"]["VALID_CONTAINER_FORMATS_VAL"],
-        #                               none_found=self.format_invalid_none)
-        # value = self._format_as_valid(self.format_as_aff_scope, f_sol6_path, value,
-        #                               self.variables["sol6"]["VALID_AFF_SCOPES_VAL"],
-        #                               none_found=self.format_invalid_none)
-        # value = self._format_as_valid(self.format_as_storage, f_sol6_path, value,
-        #                               self.variables["sol6"]["VALID_STORAGE_TYPES_VAL"],
-        #                               none_found=self.format_invalid_none, fuzzy=True)
-        value = self._first_list_elem(self.first_list_elem, value)
-        value = self._nth_list_elem(self.nth_list_elem, value, run)
-        value = self._check_for_null(value)
+
+        for transform in self.mapping_plan.pipeline(self):
+            value = transform(value, f_sol6_path, f_sol1_path, run)
+            if value is APPENDED:
+                # The rest of the transforms run on the whole list, in flush_appends
+                return None
 
         return value
 
-    def set_flags_false(self):
+    def flush_appends(self):
         """
-        Set all the given flags false.
-        If more flags need to be added, override this method
+        Write the lists of the values appended by the last mapping, with the transforms that come
+        after the append run on every list
         """
-        # Reset these for every mapping
-        self.key_as_value       = False
-        self.only_number        = False
-        self.only_number_float  = False
-        self.append_list        = False
-        self.first_list_elem    = False
-        self.nth_list_elem      = False
-        self.tosca_use_value    = False
-        self.format_as_ip       = False
-        self.format_as_container = False
-        self.format_as_disk     = False
-        self.format_as_aff_scope = False
-        self.format_as_storage = False
-        self.fail_silent        = False
-        self.req_parent         = False
-        self.format_invalid_none = False
-        self.unit_gb            = False
-        self.unit_fractional    = False
-        self.min_1              = False
+        if not self.append_buffer:
+            return
+        after = self.mapping_plan.pipeline_after(self, "_flag_append_to_list")
 
-    def set_flags_loop(self, flags, keys):
-        """
-        Handle figuring out which flags need to be set in O(n) time
-        """
-        # Ensure flags is iterable
-        if not isinstance(flags, tuple):
-            flags = [flags]
-        if flags and not flags[0] == '':
-            log.debug("Flags: {}".format(flags))
-
-        for flag in flags:
-            if flag == keys.FLAG_KEY_SET_VALUE:
-                self.key_as_value = True
-            if flag == keys.FLAG_ONLY_NUMBERS:
-                self.only_number = True
-            if flag == keys.FLAG_APPEND_LIST:
-                self.append_list = True
-            if flag == keys.FLAG_ONLY_NUMBERS_FLOAT:
-                self.only_number_float = True
-            if flag == keys.FLAG_LIST_FIRST:
-                self.first_list_elem = True
-            if flag == keys.FLAG_USE_VALUE:
-                self.tosca_use_value = True
-            if flag == keys.FLAG_FORMAT_IP:
-                self.format_as_ip = True
-            if flag == keys.FLAG_FAIL_SILENT:
-                self.fail_silent = True
-            if flag == keys.FLAG_REQ_PARENT:
-                self.req_parent = True
-            if flag == keys.FLAG_FORMAT_DISK_FMT:
-                self.format_as_disk = True
-            if flag == keys.FLAG_FORMAT_CONT_FMT:
-                self.format_as_container = True
-            if flag == keys.FLAG_FORMAT_AFF_SCOPE:
-                self.format_as_aff_scope = True
-            if flag == keys.FLAG_FORMAT_STORAGE_TYPE:
-                self.format_as_storage = True
-            if flag == keys.FLAG_FORMAT_INVALID_NONE:
-                self.format_invalid_none = True
-            if flag == keys.FLAG_UNIT_GB:
-                self.unit_gb = True
-            if flag == keys.FLAG_UNIT_FRACTIONAL:
-                self.unit_fractional = True
-            if flag == keys.FLAG_MIN_1:
-                self.min_1 = True
+        for path, values, (sol6_path, run), always in self.append_buffer.flush():
+            cur_list = get_path_value(path, self.sol1_vnfd, must_exist=False, no_msg=self.fail_silent)
+            value = AppendBuffer.extend(cur_list, values)
+            for transform in after:
+                value = transform(value, sol6_path, path, run)
+
+            # Like the mapped values, the empty lists aren't written unless they are 0
+            if always or value or (value == 0 and type(value) is int):
+                set_path_to(path, self.sol1_vnfd, value, create_missing=True)
+
+    # ---------------------
+    # ** Flag transforms **
+    # They all take (value, sol6 path, sol1 path, run) and return the new value
+    def _flag_convert_units(self, value, sol6_path, sol1_path, run):
+        return self._convert_units(True, "GB", value, is_float=self.unit_fractional)
+
+    def _flag_only_number(self, value, sol6_path, sol1_path, run):
+        return self._only_number(True, value, is_float=self.only_number_float)
+
+    def _flag_min_1(self, value, sol6_path, sol1_path, run):
+        return self._min_1(True, value)
+
+    def _flag_append_to_list(self, value, sol6_path, sol1_path, run):
+        return self._append_to_list(True, sol1_path, value, sol6_path, run)
+
+    def _flag_format_as_ip(self, value, sol6_path, sol1_path, run):
+        return self._format_as_valid(True, sol6_path, value, self.variables["sol6"]["VALID_PROTOCOLS_VAL"],
+                                     none_found=self.format_invalid_none, fuzzy=True)
+
+    def _flag_first_list_elem(self, value, sol6_path, sol1_path, run):
+        return self._first_list_elem(True, value)
+
+    def _flag_nth_list_elem(self, value, sol6_path, sol1_path, run):
+        return self._nth_list_elem(True, value, run)
+
+    def _flag_check_for_null(self, value, sol6_path, sol1_path, run):
+        return self._check_for_null(value)
 
     # ---------------------
     # ** Specific flag methods **
-    def _append_to_list(self, option, path, value):
+    def _append_to_list(self, option, path, value, sol6_path=None, run=0):
         if not option:
             return value
-        cur_list = get_path_value(path, self.sol1_vnfd, must_exist=False, no_msg=self.fail_silent)
-        # If it doesn't exist, create it
-        if not cur_list:
-            cur_list = []
-
-        # This means a value exists in the path, so convert it to a list
-        if not isinstance(cur_list, list):
-            # Convert it to a list, then continue
-            cur_list = [cur_list]
-
-        # Now that everything is together in a list, append the value
-        cur_list.append(value)
-        return cur_list
+        # The list is read, extended and written once after the mapping, in flush_appends
+        self.append_buffer.append(path, value, sol6_path, run)
+        return APPENDED
 
     def _key_as_value(self, option, path):
         if option:
@@ -229,18 +230,11 @@ class Sol1Flags:
         if not isinstance(val, str):
             return False, "{} (INVALID)".format(val)
 
-        tmp_val = val.lower()
-
-        for opt in valid_opts:
-            tmp_opt = opt.lower()
-            tmp_val = tmp_val.replace("_", "-")
-            # We found a valid mapping, so set the value to the actual formatted value
-            if tmp_val == tmp_opt:
-                return True, str(opt)
-            # Do more lax checking if specified
-            if fuzzy:
-                if tmp_val in tmp_opt or tmp_opt in tmp_val:
-                    return True, str(opt)
+        # We found a valid mapping, so set the value to the actual formatted value
+        # fuzzy does more lax checking, see utils.valid_values
+        opt = valid_values(valid_opts).match(val, fuzzy=fuzzy)
+        if opt is not None:
+            return True, opt
 
         if return_none:
             return False, None
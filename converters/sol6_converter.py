@@ -2,6 +2,11 @@ import re
 from keys.sol6_keys import *
 from utils.dict_utils import *
 from utils.key_utils import KeyUtils
+from utils.input_index import InputIndex
+from utils.valid_values import valid_values
+from converters.mapping_plan import MappingPlan
+from converters.append_buffer import AppendBuffer, APPENDED
+from utils.profiler import NO_PROFILER
 import logging
 log = logging.getLogger(__name__)
 
@@ -12,10 +17,65 @@ class Sol6Converter:
     vnfd = None
     keys = None
 
-    def __init__(self, tosca_vnf, parsed_dict, variables=None):
+    # The flag constant of the keys -> the attribute that is set while a mapping with that flag runs
+    # If more flags need to be added, extend this in the subclass
+    flag_attrs = (
+        ("FLAG_KEY_SET_VALUE",          "key_as_value"),
+        ("FLAG_ONLY_NUMBERS",           "only_number"),
+        ("FLAG_APPEND_LIST",            "append_list"),
+        ("FLAG_ONLY_NUMBERS_FLOAT",     "only_number_float"),
+        ("FLAG_LIST_FIRST",             "first_list_elem"),
+        ("FLAG_LIST_NTH",               "nth_list_elem"),
+        ("FLAG_USE_VALUE",              "tosca_use_value"),
+        ("FLAG_FORMAT_IP",              "format_as_ip"),
+        ("FLAG_FAIL_SILENT",            "fail_silent"),
+        ("FLAG_REQ_PARENT",             "req_parent"),
+        ("FLAG_FORMAT_DISK_FMT",        "format_as_disk"),
+        ("FLAG_FORMAT_CONT_FMT",        "format_as_container"),
+        ("FLAG_FORMAT_AFF_SCOPE",       "format_as_aff_scope"),
+        ("FLAG_FORMAT_STORAGE_TYPE",    "format_as_storage"),
+        ("FLAG_FORMAT_INVALID_NONE",    "format_invalid_none"),
+        ("FLAG_UNIT_GB",                "unit_gb"),
+        ("FLAG_UNIT_FRACTIONAL",        "unit_fractional"),
+        ("FLAG_MIN_1",                  "min_1"),
+    )
+    # nth_list_elem has never been reset between mappings, once a mapping sets it it stays set
+    sticky_flag_attrs = ("nth_list_elem",)
+
+    # The value transforms of the flags in the order they run: (attribute that turns it on, method)
+    # None runs the method for every value
+    flag_transforms = (
+        ("unit_gb",                     "_flag_convert_units"),
+        ("only_number",                 "_flag_only_number"),
+        ("min_1",                       "_flag_min_1"),
+        ("append_list",                 "_flag_append_to_list"),
+        ("format_as_ip",                "_flag_format_as_ip"),
+        ("format_as_disk",              "_flag_format_as_disk"),
+        ("format_as_container",         "_flag_format_as_container"),
+        ("format_as_aff_scope",         "_flag_format_as_aff_scope"),
+        ("format_as_storage",           "_flag_format_as_storage"),
+        ("first_list_elem",             "_flag_first_list_elem"),
+        ("nth_list_elem",               "_flag_nth_list_elem"),
+        (None,                          "_flag_check_for_null"),
+    )
+
+    def __init__(self, tosca_vnf, parsed_dict, variables=None, mapping_plan=None, profiler=NO_PROFILER):
+        """
+        :param mapping_plan: A MappingPlan from new_mapping_plan to reuse, a new one is made if not given
+        :param profiler: A Profiler to record the conversion phases in
+        """
         self.tosca_vnf = tosca_vnf
         self.parsed_dict = parsed_dict
         self.variables = variables
+        self.mapping_plan = mapping_plan if mapping_plan else self.new_mapping_plan()
+        self.profiler = profiler
+        self.flag_mask = 0
+        # flag_mask -> the bound transforms that run for it, from the mapping plan
+        self.flag_pipelines = {}
+        # The values of the mappings with FLAG_APPEND_LIST, written by flush_appends
+        self.append_buffer = AppendBuffer()
+        # The InputIndex of tosca_vnf, made by convert_variables unless it is set before
+        self.input_index = None
 
         # Set this up for _virtual_get_flavor_names
         self.run_deltas = True
@@ -43,6 +103,10 @@ class Sol6Converter:
         self.unit_fractional    = False
         self.min_1              = False
 
+    @classmethod
+    def new_mapping_plan(cls):
+        return MappingPlan(cls.flag_attrs, cls.sticky_flag_attrs, cls.flag_transforms)
+
     def convert(self, provider=None):
         """
         For overriding
@@ -57,6 +121,10 @@ class Sol6Converter:
         If there is a definition in the TOSCA config file for that given variable name,
         then replace the instances of that variable with the value in the config
         """
+        # The index is kept for the mapping, to resolve the inputs that are left
+        if self.input_index is None:
+            self.input_index = InputIndex(self.tosca_vnf)
+
         # Also skip the section if the whole section isn't defined
         if "input_values" not in self.variables["tosca"]:
             return
@@ -66,36 +134,8 @@ class Sol6Converter:
         if not defined_vars:
             return
 
-        inputs = get_roots_from_filter(self.tosca_vnf, child_value="get_input")
-
-        for i in inputs:
-            # Strip the outer key, we don't need it
-            cur = i[get_dict_key(i)]
-
-            # Now there *should* be at least one {'get_input': ...} under one of the keys in here
-            # Try to find that value
-            for k in cur.keys():
-                # We need the dict so we can modify it via 'reference'
-                if k != 'get_input':
-                    v = cur[k]
-                else:
-                    v = cur
-                # We know we're looking for a dict, so skip if it isn't one
-                if not isinstance(v, dict):
-                    continue
-
-                if 'get_input' in v:
-                    var_name = v['get_input']
-                    # Skip if the given variable isn't one that's defined
-                    if var_name not in defined_vars:
-                        continue
-
-                    # Overwrite the get_input dict with just the value from the config
-                    if k == 'get_input':
-                        # We need to overwrite the value of one level above
-                        i[get_dict_key(i)] = defined_vars[var_name]
-                    else:
-                        cur[k] = defined_vars[var_name]
+        # Overwrite the get_input dicts with just the value from the config
+        self.input_index.substitute(defined_vars)
 
     # *************************
     # ** Run Mapping Methods **
@@ -106,8 +146,34 @@ class Sol6Converter:
         If there are multiple flags, they will be grouped in a tuple as well
         """
         for ((tosca_path, flags), map_sol6) in keys.mapping:
-            self.run_mapping_flags(flags, keys)
-            self.run_mapping_map_needed(tosca_path, map_sol6)
+            # The paths and flags only depend on the configs, so they are compiled once in the plan
+            entry = self.mapping_plan.entry(keys, tosca_path, flags, map_sol6)
+            self.mapping_plan.apply(self, entry.mask)
+            if isinstance(map_sol6, list):
+                map_sol6 = [entry.sol6_path, map_sol6[1]]
+            else:
+                map_sol6 = entry.sol6_path
+            self.run_mapping_map_needed(entry.source_path, map_sol6)
+            self.flush_appends()
+
+    def flush_appends(self):
+        """
+        Write the lists of the values appended by the last mapping, with the transforms that come
+        after the append run on every list
+        """
+        if not self.append_buffer:
+            return
+        after = self.mapping_plan.pipeline_after(self, "_flag_append_to_list")
+
+        for path, values, (run,), always in self.append_buffer.flush():
+            cur_list = get_path_value(path, self.vnfd, must_exist=False, no_msg=self.fail_silent)
+            value = AppendBuffer.extend(cur_list, values)
+            for transform in after:
+                value = transform(value, path, run)
+
+            # Like the mapped values, the empty lists aren't written unless they are 0
+            if always or value or (value == 0 and type(value) is int):
+                set_path_to(path, self.vnfd, value, create_missing=True)
 
     def run_mapping_islist(self, tosca_path, map_sol6):
         """
@@ -160,7 +226,11 @@ class Sol6Converter:
         # Handle the various flags for no mappings
         value = self.handle_flags(sol6_path, tosca_path, 0)
 
-        set_path_to(sol6_path, self.vnfd, value, create_missing=True)
+        # Appended values are written by flush_appends, always like the other values here
+        if self.append_list:
+            self.append_buffer.write_always(sol6_path)
+        else:
+            set_path_to(sol6_path, self.vnfd, value, create_missing=True)
 
     def run_mapping_map_needed(self, tosca_path, map_sol6):
         """
@@ -181,140 +251,77 @@ class Sol6Converter:
         else:  # No mapping needed
             self.run_mapping_notlist(tosca_path, map_sol6)
 
-    def run_mapping_flags(self, flags, keys):
-        """
-        Handle various flag operations, such as setting them to false and updating their values
-        Called from run_mapping
-        """
-        self.set_flags_false()
-        self.set_flags_loop(flags, keys)
-
     # ******************
     # ** Flag methods **
     # ******************
     def handle_flags(self, f_sol6_path, f_tosca_path, run):
         """
-        Returns the value after being formatted by the flags
+        Returns the value after being formatted by the flags, or None if it was appended to a list
+        Only the transforms of the flags that are set are run, see flag_transforms
         """
-
         value = self._key_as_value(self.key_as_value, f_tosca_path)
 
-        value = self._convert_units(self.unit_gb, "GB", value, is_float=self.unit_fractional)
-        value = self._only_number(self.only_number, value, is_float=self.only_number_float)
-        value = self._min_1(self.min_1, value)
-        value = self._append_to_list(self.append_list, f_sol6_path, value)
-        value = self._format_as_valid(self.format_as_ip, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_PROTOCOLS_VAL"],
-                                      none_found=self.format_invalid_none,
-                                      prefix=self.variables["sol6"]["PROTOCOLS_PREFIX_VAL"])
-        value = self._format_as_valid(self.format_as_disk, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_DISK_FORMATS_VAL"],
-                                      none_found=self.format_invalid_none)
-        value = self._format_as_valid(self.format_as_container, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_CONTAINER_FORMATS_VAL"],
-                                      none_found=self.format_invalid_none)
-        value = self._format_as_valid(self.format_as_aff_scope, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_AFF_SCOPES_VAL"],
-                                      none_found=self.format_invalid_none)
-        value = self._format_as_valid(self.format_as_storage, f_sol6_path, value,
-                                      self.variables["sol6"]["VALID_STORAGE_TYPES_VAL"],
-                                      none_found=self.format_invalid_none, fuzzy=True)
-        value = self._first_list_elem(self.first_list_elem, f_sol6_path, value)
-        value = self._nth_list_elem(self.nth_list_elem, value, run)
-        value = self._check_for_null(value)
+        for transform in self.mapping_plan.pipeline(self):
+            value = transform(value, f_sol6_path, run)
+            if value is APPENDED:
+                # The rest of the transforms run on the whole list, in flush_appends
+                return None
 
         return value
 
-    def set_flags_false(self):
-        """
-        Set all the given flags false.
-        If more flags need to be added, override this method
-        """
-        # Reset these for every mapping
-        self.key_as_value       = False
-        self.only_number        = False
-        self.only_number_float  = False
-        self.append_list        = False
-        self.first_list_elem    = False
-        self.tosca_use_value    = False
-        self.format_as_ip       = False
-        self.format_as_container = False
-        self.format_as_disk     = False
-        self.format_as_aff_scope = False
-        self.format_as_storage = False
-        self.fail_silent        = False
-        self.req_parent         = False
-        self.format_invalid_none = False
-        self.unit_gb            = False
-        self.unit_fractional    = False
-        self.min_1              = False
+    # ---------------------
+    # ** Flag transforms **
+    # They all take (value, sol6 path, run) and return the new value
+    def _flag_convert_units(self, value, path, run):
+        return self._convert_units(True, "GB", value, is_float=self.unit_fractional)
 
-    def set_flags_loop(self, flags, keys):
-        """
-        Handle figuring out which flags need to be set in O(n) time
-        """
-        # Ensure flags is iterable
-        if not isinstance(flags, tuple):
-            flags = [flags]
-        if flags and not flags[0] == '':
-            log.debug("Flags: {}".format(flags))
-
-        for flag in flags:
-            if flag == keys.FLAG_KEY_SET_VALUE:
-                self.key_as_value = True
-            if flag == keys.FLAG_ONLY_NUMBERS:
-                self.only_number = True
-            if flag == keys.FLAG_APPEND_LIST:
-                self.append_list = True
-            if flag == keys.FLAG_ONLY_NUMBERS_FLOAT:
-                self.only_number_float = True
-            if flag == keys.FLAG_LIST_FIRST:
-                self.first_list_elem = True
-            if flag == keys.FLAG_LIST_NTH:
-                self.nth_list_elem = True
-            if flag == keys.FLAG_USE_VALUE:
-                self.tosca_use_value = True
-            if flag == keys.FLAG_FORMAT_IP:
-                self.format_as_ip = True
-            if flag == keys.FLAG_FAIL_SILENT:
-                self.fail_silent = True
-            if flag == keys.FLAG_REQ_PARENT:
-                self.req_parent = True
-            if flag == keys.FLAG_FORMAT_DISK_FMT:
-                self.format_as_disk = True
-            if flag == keys.FLAG_FORMAT_CONT_FMT:
-                self.format_as_container = True
-            if flag == keys.FLAG_FORMAT_AFF_SCOPE:
-                self.format_as_aff_scope = True
-            if flag == keys.FLAG_FORMAT_STORAGE_TYPE:
-                self.format_as_storage = True
-            if flag == keys.FLAG_FORMAT_INVALID_NONE:
-                self.format_invalid_none = True
-            if flag == keys.FLAG_UNIT_GB:
-                self.unit_gb = True
-            if flag == keys.FLAG_UNIT_FRACTIONAL:
-                self.unit_fractional = True
-            if flag == keys.FLAG_MIN_1:
-                self.min_1 = True
+    def _flag_only_number(self, value, path, run):
+        return self._only_number(True, value, is_float=self.only_number_float)
+
+    def _flag_min_1(self, value, path, run):
+        return self._min_1(True, value)
+
+    def _flag_append_to_list(self, value, path, run):
+        return self._append_to_list(True, path, value, run)
+
+    def _flag_format_as_ip(self, value, path, run):
+        return self._format_as_valid(True, path, value, self.variables["sol6"]["VALID_PROTOCOLS_VAL"],
+                                     none_found=self.format_invalid_none,
+                                     prefix=self.variables["sol6"]["PROTOCOLS_PREFIX_VAL"])
+
+    def _flag_format_as_disk(self, value, path, run):
+        return self._format_as_valid(True, path, value, self.variables["sol6"]["VALID_DISK_FORMATS_VAL"],
+                                     none_found=self.format_invalid_none)
+
+    def _flag_format_as_container(self, value, path, run):
+        return self._format_as_valid(True, path, value, self.variables["sol6"]["VALID_CONTAINER_FORMATS_VAL"],
+                                     none_found=self.format_invalid_none)
+
+    def _flag_format_as_aff_scope(self, value, path, run):
+        return self._format_as_valid(True, path, value, self.variables["sol6"]["VALID_AFF_SCOPES_VAL"],
+                                     none_found=self.format_invalid_none)
+
+    def _flag_format_as_storage(self, value, path, run):
+        return self._format_as_valid(True, path, value, self.variables["sol6"]["VALID_STORAGE_TYPES_VAL"],
+                                     none_found=self.format_invalid_none, fuzzy=True)
+
+    def _flag_first_list_elem(self, value, path, run):
+        return self._first_list_elem(True, path, value)
+
+    def _flag_nth_list_elem(self, value, path, run):
+        return self._nth_list_elem(True, value, run)
+
+    def _flag_check_for_null(self, value, path, run):
+        return self._check_for_null(value)
 
     # ---------------------
     # ** Specific flag methods **
-    def _append_to_list(self, option, path, value):
+    def _append_to_list(self, option, path, value, run=0):
         if not option:
             return value
-        cur_list = get_path_value(path, self.vnfd, must_exist=False, no_msg=self.fail_silent)
-        # If it doesn't exist, create it
-        if not cur_list:
-            cur_list = []
-
-        # This means a value exists in the path, so convert it to a list
-        if not isinstance(cur_list, list):
-            # Convert it to a list, then continue
-            cur_list = [cur_list]
-
-        # Now that everything is together in a list, append the value
-        cur_list.append(value)
-        return cur_list
+        # The list is read, extended and written once after the mapping, in flush_appends
+        self.append_buffer.append(path, value, run)
+        return APPENDED
 
     def _key_as_value(self, option, path):
         if option:
@@ -383,18 +390,11 @@ class Sol6Converter:
         if not isinstance(val, str):
             return False, "{} (INVALID)".format(val)
 
-        tmp_val = val.lower()
-
-        for opt in valid_opts:
-            tmp_opt = opt.lower()
-            tmp_val = tmp_val.replace("_", "-")
-            # We found a valid mapping, so set the value to the actual formatted value
-            if tmp_val == tmp_opt:
-                return True, str(opt)
-            # Do more lax checking if specified
-            if fuzzy:
-                if tmp_val in tmp_opt or tmp_opt in tmp_val:
-                    return True, str(opt)
+        # We found a valid mapping, so set the value to the actual formatted value
+        # fuzzy does more lax checking, see utils.valid_values
+        opt = valid_values(valid_opts).match(val, fuzzy=fuzzy)
+        if opt is not None:
+            return True, opt
 
         if return_none:
             return False, None
@@ -442,15 +442,22 @@ class Sol6Converter:
     # ---------------------
 
     @staticmethod
-    def find_provider(tosca_lines):
+    def find_provider(tosca_data):
         """
         Do a dumb search over the file to find the provider
+        :param tosca_data: The raw bytes of the file, or a list of its lines
         """
         found = None
-        for l in tosca_lines:
-            if "provider:" in str(l):
-                found = l
-                break
+        if isinstance(tosca_data, bytes):
+            # Search the buffer directly instead of splitting it into lines
+            match = re.search(rb"^.*provider:.*$", tosca_data, re.MULTILINE)
+            if match:
+                found = match.group(0)
+        else:
+            for l in tosca_data:
+                if "provider:" in str(l):
+                    found = l
+                    break
         if not found:
             raise ValueError("Provider not found")
         prov = found.decode("utf-8").strip()
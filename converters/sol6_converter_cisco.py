@@ -2,15 +2,25 @@ from keys.sol6_keys_cisco import *
 from converters.sol6_converter import Sol6Converter
 from keys.sol6_keys import *
 from utils.dict_utils import *
+from utils.profiler import NO_PROFILER
 
 
 class SOL6ConverterCisco(Sol6Converter):
-
-    def __init__(self, tosca_vnf, parsed_dict, variables=None):
-        super().__init__(tosca_vnf, parsed_dict, variables)
-
-        # Initialize the flag variables you use here, even though they'll always be defined
-        # by set_flags_false, it's good practice
+    flag_attrs = Sol6Converter.flag_attrs + (
+        ("FLAG_VAR",                    "is_variable"),
+        ("FLAG_TYPE_ROOT_DEF",          "default_root"),
+        ("FLAG_REQ_DELTA",              "req_delta_valid"),
+    )
+    # The inputs and the default root are handled last, after the null check
+    flag_transforms = Sol6Converter.flag_transforms + (
+        ("is_variable",                 "_flag_handle_input"),
+        ("default_root",                "_flag_handle_default_root"),
+    )
+
+    def __init__(self, tosca_vnf, parsed_dict, variables=None, mapping_plan=None, profiler=NO_PROFILER):
+        super().__init__(tosca_vnf, parsed_dict, variables, mapping_plan, profiler)
+
+        # Initialize the flag variables you use here, they all start unset
         self.req_delta_valid = False
         self.format_as_ip = False
         self.is_variable = False
@@ -25,16 +35,20 @@ class SOL6ConverterCisco(Sol6Converter):
 
         # The very first thing we want to do is set up the path variables
         log.debug("Setting path variables: {}".format(self.variables))
-        formatted_vars = PathMapping.format_paths(self.variables)
+        with self.profiler.phase("set_variables"):
+            formatted_vars = PathMapping.format_paths(self.variables)
 
-        TOSCA.set_variables(self.variables["tosca"], TOSCA, variables=formatted_vars,
-                            dict_tosca=self.tosca_vnf, cur_provider=provider)
+            # The conversion works on its own copy of the variables, the given ones are shared
+            self.variables = TOSCA.provider_variables(formatted_vars, dict_tosca=self.tosca_vnf,
+                                                      cur_provider=provider)
 
         self.vnfd = {}
 
-        keys = V2Map(self.tosca_vnf, self.vnfd, variables=self.variables)
+        with self.profiler.phase("v2map"):
+            keys = V2Map(self.tosca_vnf, self.vnfd, variables=self.variables, input_index=self.input_index)
 
-        self.run_mapping(keys)
+        with self.profiler.phase("run_mapping"):
+            self.run_mapping(keys)
 
         return self.vnfd
 
@@ -72,37 +86,11 @@ class SOL6ConverterCisco(Sol6Converter):
             if write:
                 set_path_to(f_sol6_path, self.vnfd, value, create_missing=True)
 
-    def set_flags_false(self):
-        """
-        Set all the flags defined in this class to false.
-        This resets them every loop so they aren't applied when they shouldn't be.
-        """
-        super().set_flags_false()
-        self.is_variable = False
-        self.default_root = False
-        self.req_delta_valid = False
-        self.format_as_ip = False
-
-    def set_flags_loop(self, flags, keys):
-        super().set_flags_loop(flags, keys)
-        # Ensure flags is iterable
-        if not isinstance(flags, tuple):
-            flags = [flags]
-
-        for flag in flags:
-            if flag == keys.FLAG_VAR:
-                self.is_variable = True
-            if flag == keys.FLAG_TYPE_ROOT_DEF:
-                self.default_root = True
-            if flag == keys.FLAG_REQ_DELTA:
-                self.req_delta_valid = True
-
-    def handle_flags(self, f_sol6_path, f_tosca_path, run):
-        value = super().handle_flags(f_sol6_path, f_tosca_path, run)
-        value = self._handle_input(self.is_variable, f_sol6_path, value)
-        value = self._handle_default_root(self.default_root, f_sol6_path, value)
+    def _flag_handle_input(self, value, path, run):
+        return self._handle_input(True, path, value)
 
-        return value
+    def _flag_handle_default_root(self, value, path, run):
+        return self._handle_default_root(True, path, value)
 
     # Flag option formatting methods
     def _handle_default_root(self, option, path, value):
@@ -15,6 +15,7 @@ class PathMapping:
         Pass in the inputs variable, then create the full paths for 'tosca' and 'sol6'
         If _VAL is at the end of the variable, don't process the path, just set the variable to
         the value.
+        The variables are not modified, a copy with the processed paths is returned.
         """
         var_tosca = variables["tosca"]
         var_sol6 = variables["sol6"]
@@ -34,9 +35,10 @@ class PathMapping:
             else:
                 val = var_sol6[k]
             processed_sol6[k] = val
-        variables["tosca"] = processed_tosca
-        variables["sol6"] = processed_sol6
-        return variables
+        formatted = dict(variables)
+        formatted["tosca"] = processed_tosca
+        formatted["sol6"] = processed_sol6
+        return formatted
 
     @staticmethod
     def set_variables(cur_dict, obj, exclude=""):
@@ -125,8 +127,8 @@ class V2MapBase(V2Mapping):
     FLAG_UNIT_GB                    = "UNITISGB"
     FLAG_UNIT_FRACTIONAL            = "UNITISFRACTIONAL"
 
-    def __init__(self, dict_tosca, dict_sol6, c_log=None, variables=None):
-        super().__init__(dict_tosca, dict_sol6)
+    def __init__(self, dict_tosca, dict_sol6, c_log=None, variables=None, input_index=None):
+        super().__init__(dict_tosca, dict_sol6, input_index=input_index)
         self.va_s = None
         self.va_t = None
         self.mapping = []
@@ -4,7 +4,7 @@ The TOSCA variables are mapped to the SOL6 ones, they must have the same names.
 The program does not attempt to map variables beginning with '_'
 """
 from keys.sol6_keys import TOSCA_BASE, SOL6_BASE, V2MapBase
-from mapping_v2 import MapElem
+from mapping_v2 import MapElem, MapIndex
 from utils.dict_utils import *
 from utils.list_utils import *
 from utils.key_utils import *
@@ -27,10 +27,12 @@ class TOSCA(TOSCA_BASE):
         return key_exists(item, "properties{}sw_image_data".format(SPLIT_CHAR))
 
     @staticmethod
-    def set_variables(cur_dict, obj, exclude="", variables=None, dict_tosca=None, cur_provider=None):
+    def provider_variables(variables, dict_tosca=None, cur_provider=None):
         """
         Take the input from the config file, and set the variables that are identifiers here
         This must be run before the values are used
+        The variables are not modified, so they can be shared between conversions, a copy with the
+        identifiers of the provider is returned.
         """
         if not cur_provider:
             cur_provider = get_path_value(V2MapBase.get_value("vnf_provider", variables["tosca"]),
@@ -47,6 +49,8 @@ class TOSCA(TOSCA_BASE):
 
         # Get the identifiers and assign them to the relevant locations
         # It is unlikely we will ever have sol6 identifiers
+        variables = dict(variables)
+        variables["tosca"] = dict(variables["tosca"])
         variables["tosca"]["virt_storage_identifier"] = provider_identifiers["virtual_storage"]
         variables["tosca"]["vdu_identifier"] = provider_identifiers["vdu"]
         variables["tosca"]["int_cpd_identifier"] = provider_identifiers["int_cpd"]
@@ -58,6 +62,7 @@ class TOSCA(TOSCA_BASE):
         variables["tosca"]["anti_affinity_identifier"] = provider_identifiers["anti_affinity_rule"]
         variables["tosca"]["affinity_identifier"] = provider_identifiers["affinity_rule"]
         variables["tosca"]["placement_group_identifier"] = provider_identifiers["placement_group"]
+        return variables
 
 
 class SOL6(SOL6_BASE):
@@ -77,8 +82,8 @@ class V2Map(V2MapBase):
     # Marks this as requiring a value, and if there isn't one, make it 'root'
     FLAG_TYPE_ROOT_DEF              = "MUSTBESOMETHINGORROOT"
 
-    def __init__(self, dict_tosca, dict_sol6, variables=None):
-        super().__init__(dict_tosca, dict_sol6, c_log=log, variables=variables)
+    def __init__(self, dict_tosca, dict_sol6, variables=None, input_index=None):
+        super().__init__(dict_tosca, dict_sol6, c_log=log, variables=variables, input_index=input_index)
 
         # Make the lines shorter
         add_map = self.add_map
@@ -87,10 +92,6 @@ class V2Map(V2MapBase):
         tv = self.tv
         sv = self.sv
 
-        TOSCA.get_path_value = get_path_value
-        TOSCA.key_exists = key_exists
-        TOSCA.get_dict_key = get_dict_key
-
         # Generate VDU map
         vdu_map = self.generate_map(None, tv("vdu_identifier"))
 
@@ -311,15 +312,20 @@ class V2Map(V2MapBase):
         if ext_nics:
             # Extract the names from the list
             ext_nics = [e[get_dict_key(e)][0] for e in ext_nics]
-            # Intersection: ext_nics and cps_map
-            ext_cps = [m for m in cps_map if any(nic == m.name for nic in ext_nics)]
-            # Union: ext_nics and cps_map
-            int_cps = [m for m in cps_map if not any(nic == m.name for nic in ext_nics)]
+
+            # Get the NICs that are assigned to management
+            # This does not take into account if they are supposed to be mapped to an ECP
+            mgmt_cps = self.generate_map(None, tv("int_cpd_mgmt_identifier"),
+                                         field_filter=TOSCA.int_cp_mgmt,
+                                         map_function=self.int_cp_mapping,
+                                         map_args={"vdu_map": vdu_map})
+            int_cps, mgmt_cps_map, orch_cps_map = self.classify_cps(cps_map, ext_nics, mgmt_cps)
 
             # For the non-external connection points, we need to create a virtual link for them
             # They already have names in the YAML, under virtual-link, so link the CPs to those virtual
             # links, and create the links if they don't already exist
             icps_to_create = []
+            created = set()
             for icp in int_cps:
                 cur_path = MapElem.format_path(icp, tv("int_cpd_virt_link"), use_value=False)
                 virt_link = get_path_value(cur_path, self.dict_tosca, must_exist=False)
@@ -328,8 +334,14 @@ class V2Map(V2MapBase):
                 layer_protocol = get_path_value(cur_path, self.dict_tosca, must_exist=False)
                 if virt_link:
                     # Skip adding the virt_link if it already exists
-                    if virt_link in icps_to_create:
-                        continue
+                    # The extended form, {node: name}, isn't hashable so it is looked for in the list
+                    try:
+                        if virt_link in created:
+                            continue
+                        created.add(virt_link)
+                    except TypeError:
+                        if virt_link in icps_to_create:
+                            continue
                     icps_to_create.append(virt_link)
                     # Only add the layer protocol when a new virt link gets created
                     if layer_protocol:
@@ -339,23 +351,6 @@ class V2Map(V2MapBase):
             # Remove any gaps in the mapping
             MapElem.ensure_map_values(icp_create_layer_prot, start_val=0)
 
-            # Get the NICs that are assigned to management
-            # This does not take into account if they are supposed to be mapped to an ECP
-            mgmt_cps_map = self.generate_map(None, tv("int_cpd_mgmt_identifier"),
-                                             field_filter=TOSCA.int_cp_mgmt,
-                                             map_function=self.int_cp_mapping,
-                                             map_args={"vdu_map": vdu_map})
-
-            # Intersection: ext_cps and mgmt_cps_map
-            # This is the NICs that are management and should have an
-            # external connection point created
-            mgmt_cps_map = [m for m in ext_cps if any(x.name == m.name for x in mgmt_cps_map)]
-            # Union: ext_cps and mgmt_cps_map
-            # Get the non-management NICs that have external connection points
-            orch_cps_map = [m for m in ext_cps if not any(x.name == m.name for x in mgmt_cps_map)]
-            # Note: this can be sped up by putting both of these
-            # in a single loop
-
         # Security group map
         # The result isn't an array, so set the top-level values to None
         security_group_map_temp = self.generate_map(None, tv("security_group_identifier"),
@@ -819,34 +814,51 @@ class V2Map(V2MapBase):
 
         # -- End Artifact --
 
+    @staticmethod
+    def classify_cps(cps_map, ext_nics, mgmt_cps):
+        """
+        Split the connection points in a single pass:
+        The internal ones, that are not in ext_nics
+        The management ones, that are in ext_nics and mgmt_cps, so they get an external connection point
+        The orchestration ones, that are in ext_nics but not in mgmt_cps
+        :return: int_cps, mgmt_cps_map, orch_cps_map
+        """
+        ext_names = set(ext_nics)
+        mgmt_names = {m.name for m in mgmt_cps}
+        int_cps = []
+        mgmt_cps_map = []
+        orch_cps_map = []
+        for m in cps_map:
+            if m.name not in ext_names:
+                int_cps.append(m)
+            elif m.name in mgmt_names:
+                mgmt_cps_map.append(m)
+            else:
+                orch_cps_map.append(m)
+        return int_cps, mgmt_cps_map, orch_cps_map
+
     def int_cp_mapping(self, names, map_start, **kwargs):
         if "filtered" not in kwargs or "vdu_map" not in kwargs:
             raise KeyError("The proper arguments haven't been passed for this method")
 
         mapping = []
-        filtered = kwargs["filtered"]
-        vdu_mappings = list(kwargs["vdu_map"])
+        # The dict that's related to each name, there should only be one
+        entries = {get_dict_key(x): x for x in kwargs["filtered"]}
+        vdu_mappings = MapIndex(list(kwargs["vdu_map"]))
         cur_num = map_start
         last_vdu = None
 
+        # Get the virtual_binding for the elements from the filtered list
+        # Remove the beginning of the path since we aren't dealing with the entire dict here
+        path_lvl = KeyUtils.remove_path_level(self.get_tosca_value("int_cpd_virt_binding"),
+                                              self.get_tosca_value("node_templates"))
+
         # Loop through the CP names
         for name in names:
-            # Get the dict that's related to this name
-            # There should only be one element in the list
-            entry = [x for x in filtered if get_dict_key(x) == name].pop()
-
-            # Get the virtual_binding for this element from the filtered list
-            # Remove the beginning of the path since we aren't dealing with the entire dict here
-            path_lvl = KeyUtils.remove_path_level(self.get_tosca_value("int_cpd_virt_binding"),
-                                                  self.get_tosca_value("node_templates"))
-            vdu = get_path_value(path_lvl.format(name), entry)
+            vdu = get_path_value(path_lvl.format(name), entries[name])
 
             # We need to find the parent mapping so we can include it in the map definition
-            cur_vdu_map = None
-            for v_map in vdu_mappings:
-                if v_map.name == vdu:
-                    cur_vdu_map = v_map
-                    break
+            cur_vdu_map = vdu_mappings.get(vdu)
 
             # Iterate the map number if we've seen this vdu before, otherwise start over from 0
             if last_vdu == vdu:
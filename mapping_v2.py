@@ -1,4 +1,6 @@
 from utils.dict_utils import *
+from utils.tosca_index import ToscaIndex
+from utils.input_index import InputIndex
 import logging
 log = logging.getLogger(__name__)
 
@@ -14,9 +16,32 @@ class V2Mapping:
     KEY_TOSCA = "dict_tosca"
     KEY_SOL6 = "dict_sol6"
 
-    def __init__(self, dict_tosca, dict_sol6):
+    def __init__(self, dict_tosca, dict_sol6, input_index=None):
+        """
+        :param input_index: The InputIndex of dict_tosca, if the converter already made one
+        """
         self.dict_tosca = dict_tosca
         self.dict_sol6 = dict_sol6
+        self._tosca_index = None
+        self._input_index = input_index
+
+    @property
+    def tosca_index(self):
+        """
+        The ToscaIndex of dict_tosca, built the first time it is needed
+        """
+        if self._tosca_index is None:
+            self._tosca_index = ToscaIndex(self.dict_tosca)
+        return self._tosca_index
+
+    @property
+    def input_index(self):
+        """
+        The InputIndex of dict_tosca, built the first time it is needed
+        """
+        if self._input_index is None:
+            self._input_index = InputIndex(self.dict_tosca)
+        return self._input_index
 
     @staticmethod
     def parent_match(map1_list, start_num=0, **kwargs):
@@ -40,16 +65,13 @@ class V2Mapping:
         parent_map = kwargs["parent_map"]
 
         result = []
+        parents = MapIndex(parent_map)
         for key in map1_list:
             value = value_dict[key]
-            final_parent_map = None
 
             # Find the element in the parent map that the cur element is mapped to
             # For example [c1_nic0 -> c1] and [c1 -> 0]
-            for p_map in parent_map:
-                if p_map.name == value:
-                    final_parent_map = p_map
-                    break
+            final_parent_map = parents.get(value)
 
             map_elem = MapElem(key, value, final_parent_map)
             result.append(map_elem)
@@ -79,6 +101,8 @@ class V2Mapping:
         none_value = kwargs["none_value"] if "none_value" in kwargs else False
         none_key = kwargs["none_key"] if "none_key" in kwargs else False
 
+        parents = MapIndex(parent_map if parent_map else value_map)
+
         result = []
         cur_num = start_num
         for item_1 in map1_list:
@@ -91,15 +115,9 @@ class V2Mapping:
                 if parent_map:
                     # Find the element in the parent map that the cur element is mapped to
                     # For example [c1_nic0 -> c1] and [c1 -> 0]
-                    for p_map in parent_map:
-                        if p_map.name == item_1:
-                            final_parent_map = p_map
-                            break
+                    final_parent_map = parents.get(item_1)
                 elif value_map:
-                    for v_map in value_map:
-                        if v_map.name == cur_num:
-                            final_parent_map = v_map
-                            break
+                    final_parent_map = parents.get(cur_num)
                 cur_num_val = None if none_value else cur_num
                 cur_item_1 = None if none_key else item_1
                 map_elem = MapElem(cur_item_1, cur_num_val, final_parent_map)
@@ -152,7 +170,10 @@ class V2Mapping:
         # Get the relevant nodes based on field and field_value
         filtered = None
         if field and field_value:
-            filtered = get_roots_from_filter(p_val, field, field_value, user_filter=field_filter)
+            # Filters over the whole dict can be answered from the index instead of walking it
+            index = self.tosca_index if p_val is self.dict_tosca else None
+            filtered = get_roots_from_filter(p_val, field, field_value, user_filter=field_filter,
+                                             index=index)
         elif path:
             # If we forgot to pass in a dict, use tosca
             if not cur_dict:
@@ -224,8 +245,7 @@ class V2Mapping:
             res = temp
         return res
 
-    @staticmethod
-    def get_input_values(in_list, tosca_inputs, dict_tosca):
+    def get_input_values(self, in_list, tosca_inputs, dict_tosca=None):
         """
         :param in_list: List of { "get_input": "VAR_NAME" }, also might be a value list
         :return: A list of the values of the inputs
@@ -233,9 +253,9 @@ class V2Mapping:
         res = []
         if tosca_inputs:
             for item in in_list:
-                if V2Mapping.is_tosca_input(item):
-                    cur_item = {item["get_input"]:
-                                V2Mapping.get_input_value(item, tosca_inputs=tosca_inputs)}
+                name = self.input_index.name(item)
+                if name is not None:
+                    cur_item = {name: tosca_inputs[name]}
                 else:
                     cur_item = item
                 res.append(cur_item)
@@ -271,18 +291,50 @@ class V2Mapping:
                      (exclude and exclude in attr))]
 
 
-class MapElem:
+class MapIndex:
+    """
+    Finds the first MapElem with a given name in a list of them, like scanning the list for it.
+    The name -> MapElem dict is built on the first lookup, so every lookup after that is a dict
+    access instead of a scan of the list. Names that can't be hashed, i.e. the extended TOSCA
+    form {node: name}, are still looked for with a scan.
     """
+    def __init__(self, map_list):
+        self.map_list = map_list
+        self._by_name = None
+
+    def get(self, name):
+        if self._by_name is None:
+            self._by_name = {}
+            for c_map in self.map_list or []:
+                try:
+                    self._by_name.setdefault(c_map.name, c_map)
+                except TypeError:
+                    pass
+        try:
+            return self._by_name.get(name)
+        except TypeError:
+            return next((c_map for c_map in self.map_list or [] if c_map.name == name), None)
+
 
+class MapElem:
     """
+    A name mapped to a value, with the parent mapping it is under.
+    Large VNFDs make hundreds of thousands of these, so they only have slots for the three fields.
+    """
+    __slots__ = ("name", "cur_map", "parent_map")
+
     def __init__(self, name, cur_map, parent_map=None):
         self.name = name
         self.cur_map = cur_map
         self.parent_map = parent_map
 
     def copy(self):
-        par = self.parent_map.copy() if self.parent_map else None
-        return MapElem(self.name, self.cur_map, par)
+        """
+        Return a new MapElem that shares the parent chain with this one.
+        The mappings only change the elements they just made or copied, never the parents of a copy,
+        so the chain doesn't have to be copied along with it.
+        """
+        return MapElem(self.name, self.cur_map, self.parent_map)
 
     @staticmethod
     def ensure_map_values(mapping, start_val=None):
@@ -373,27 +425,23 @@ class MapElem:
         Defaults to using the values of the mapping, but can be switched to use keys
         If the value of a mapping is None, it will not be formatted into the string.
         This allows different numbers of formattable elements.
+        The path is split once into a PathTemplate, and the formatted path is returned as a Path.
         """
+        template = compile_template(path)
 
-        path_list = path.split(SPLIT_CHAR)
-        while "{}" in path_list:
-            # Get the index of the last occurrence of a formattable entry
-            index = max(idx for idx, val in enumerate(path_list)
-                        if val == '{}')
-            if elem:
-                val = elem.cur_map if use_value else elem.name
-            else:
-                val = ""
-                # Skip the given value if it's None
-            if val is not None:
-                path_list[index] = path_list[index].format(val)
-
+        # The values for the formattable entries, from the last one to the first
+        values = []
+        while len(values) < len(template.slots):
             if not elem:
+                values.append("")
                 break
-
+            val = elem.cur_map if use_value else elem.name
+            # Skip the given value if it's None
+            if val is not None:
+                values.append(val)
             elem = elem.parent_map
 
-        return SPLIT_CHAR.join(path_list)
+        return template.fill(values)
 
     def __str__(self):
         return "{} -> {}, parent=({})".format(self.name, self.cur_map, self.parent_map)
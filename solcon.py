@@ -7,43 +7,40 @@ __credits__ = ["Frederick Jansson"]
 __version__ = "0.8.0"
 
 import argparse
+import cProfile
+import glob
 import json
-import yaml
 import logging
 import sys
 import os.path
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from utils import dict_utils
-from converters.sol6_converter import Sol6Converter
-from converters.sol6_converter_cisco import SOL6ConverterCisco
-from converters.sol1_converter import Sol1Converter
+from converters.converter import Converter
 from sol6_config_default import SOL6ConfigDefault
-import toml
+from solcon_server import SolConServer
+from utils.config_cache import ConfigCache
+from utils.profiler import Profiler, NO_PROFILER
+from utils.yaml_backend import YamlBackend, BACKENDS as YAML_BACKENDS
+from utils.json_backend import JsonBackend, BACKENDS as JSON_BACKENDS
+from utils.result_cache import ResultCache
+from utils.watcher import Watcher
+from utils.input_index import InputIndex
+from utils.input_sets import load_input_sets
 log = logging.getLogger(__name__)
 
 
 class SolCon:
     def __init__(self, internal_run=False, internal_args=None):
-        self.variables = None
-        self.tosca_lines = None
-        self.tosca_vnf = None
-        self.converter = None
-        self.provider = None
-        self.supported_providers = None
-        self.cnfv = None
+        self._init_state()
 
         if internal_args and internal_args["e"] is False:
             print("Starting SolCon (v{})...".format(__version__))
 
-        self.desc = "NFVO SOL6 Converter (SolCon): Convert a SOL001 (TOSCA) YAML to SOL006 JSON"
-
-        self.supported_providers = {
-            "cisco": SOL6ConverterCisco,
-            "mavenir": SOL6ConverterCisco
-        }
-
         parser = argparse.ArgumentParser(description=self.desc)
-        parser.add_argument('-f', '--file',
-                            help="The VNF YAML/JSON file to be processed")
+        parser.add_argument('-f', '--file', nargs='+',
+                            help="The VNF YAML/JSON file(s) to be processed, if more than one is given -o is "
+                                 "used as the output directory")
         parser.add_argument('-o', '--output',
                             help="The output file for the convtered VNF (JSON/YAML format), "
                                  "outputs to stdout if not specified")
@@ -57,6 +54,48 @@ class SolCon:
         parser.add_argument('-s', '--path-config-sol6',
                             help='Location of the paths configuration file for SOL6 paths (OPTIONAL) '
                                  '(TOML format)')
+        parser.add_argument('-b', '--batch',
+                            help='Convert every YAML/JSON file in the given directory (or matching the given '
+                                 'glob) in a single run. -o is required and is used as the output directory')
+        parser.add_argument('--input-sets',
+                            help='Convert the TOSCA file (-f) once for every set of input values in this TOML, '
+                                 'JSON or CSV file. -o is required and is used as the output directory')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Number of processes to convert multiple inputs (-b or several -f) with')
+        parser.add_argument('--serve', action='store_true',
+                            help='Keep running and convert the VNFs posted to the local HTTP server '
+                                 '(or Unix socket), -j is the number of concurrent conversions')
+        parser.add_argument('--watch',
+                            help='Keep running and reconvert the YAML/JSON files in this directory whenever '
+                                 'their contents change, the outputs are written next to them')
+        parser.add_argument('--watch-interval', type=float, default=0.5,
+                            help='Seconds between the checks for changed files with --watch')
+        parser.add_argument('--port', type=int, default=8080,
+                            help='Localhost port for --serve')
+        parser.add_argument('--socket',
+                            help='Serve on this Unix socket instead of the localhost port')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Seconds a --serve request can take before it times out')
+        parser.add_argument('--cache-dir', default=os.path.join(os.path.expanduser("~"), ".cache", "solcon"),
+                            help='Directory to keep the compiled configs in, set to an empty string to '
+                                 'always parse the configs')
+        parser.add_argument('--yaml-backend', choices=YAML_BACKENDS, default="auto",
+                            help="YAML implementation to read and write with, 'auto' uses libyaml if it "
+                                 "is available")
+        parser.add_argument('--json-backend', choices=JSON_BACKENDS, default="python",
+                            help="JSON encoder to write with, orjson is faster but leaves non-ASCII "
+                                 "characters unescaped")
+        parser.add_argument('--compact', action='store_true',
+                            help="Write the JSON output without indentation")
+        parser.add_argument('--profile',
+                            help="Append the time and peak memory of every conversion phase as a JSON line "
+                                 "per file to this file, '-' for stderr")
+        parser.add_argument('--profile-pstats',
+                            help="Dump cProfile stats of the whole run to this .pstats file")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Always convert, without looking up or storing the results in the cache")
+        parser.add_argument('--cache-size', type=int, default=512,
+                            help="Megabytes the cached results are kept under (default 512)")
         parser.add_argument('-r', '--provider',
                             help='Specifically provide the provider instead of trying to read '
                                  'it from the file. Supported providers: {}'
@@ -69,159 +108,517 @@ class SolCon:
         parser.add_argument('-e', '--output-silent', action='store_true', default=False,
                             help=argparse.SUPPRESS)
 
-        args = parser.parse_args()
         if internal_run:
+            # Don't read sys.argv when we're being run from inside another program
+            args = parser.parse_args([])
             args.file = internal_args["f"]
             args.output = internal_args["o"]
             args.path_config = internal_args["c"]
             if "s" in internal_args:
                 args.path_config_sol6 = internal_args["s"]
+            if "b" in internal_args:
+                args.batch = internal_args["b"]
             args.provider = internal_args["r"]
             args.log_level = internal_args["l"]
             args.output_silent = internal_args["e"]
+            if "j" in internal_args:
+                args.jobs = internal_args["j"]
+            # Only cache when it's asked for, so internal runs don't write outside of the project
+            args.cache_dir = internal_args.get("cache")
+            args.profile = internal_args.get("profile")
+            args.no_cache = internal_args.get("no_cache", False)
+            args.yaml_backend = internal_args.get("yaml_backend", "auto")
+            args.json_backend = internal_args.get("json_backend", "python")
+            args.compact = internal_args.get("compact", False)
+            args.profile_pstats = internal_args.get("profile_pstats")
+            args.input_sets = internal_args.get("input_sets")
+        else:
+            args = parser.parse_args()
+        # Always work with a list of files, even if only one was given
+        if isinstance(args.file, str):
+            args.file = [args.file]
 
         self.args = args
         self.parser = parser
+        self.yaml = YamlBackend(args.yaml_backend)
+        self.json = JsonBackend(args.json_backend, compact=args.compact)
 
         if args.interactive:
             self.interactive_mode()
             return
 
-        if not args.file or not args.path_config:
+        multi_input = args.batch or (args.file and len(args.file) > 1)
+        if args.serve or args.watch:
+            if not args.path_config:
+                print("error: the following arguments are required with --{}: -c/--path-config"
+                      .format("serve" if args.serve else "watch"))
+                return
+        elif args.input_sets:
+            if not args.file or len(args.file) > 1 or not args.output or not args.path_config:
+                print("error: the following arguments are required with --input-sets: a single -f/--file, "
+                      "-o/--output, -c/--path-config")
+                return
+        elif multi_input:
+            if not args.output or not args.path_config:
+                print("error: the following arguments are required with multiple inputs: -o/--output, "
+                      "-c/--path-config")
+                return
+        elif not args.file or not args.path_config:
             print("error: the following arguments are required: -f/--file, -c/--path-config")
             return
 
-        # Determine if the file we're converting is tosca or sol6 based on the file extension
-        is_yaml = args.file.split(".")[-1].lower() == "yaml"
-
-        sol6_config_isfile = True
-        if not args.path_config_sol6:
-            args.path_config_sol6 = SOL6ConfigDefault.config
-            sol6_config_isfile = False
-
         # Initialize the log and have the level set properly
         setup_logger(args.log_level)
 
-        # Read the configs
-        self.variables = self.read_configs(args.path_config, args.path_config_sol6, sol6_config_isfile)
+        if args.profile_pstats:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                self._run(multi_input)
+            finally:
+                profile.disable()
+                profile.dump_stats(args.profile_pstats)
+                log.info("Wrote the profile stats to {}".format(args.profile_pstats))
+        else:
+            self._run(multi_input)
+
+    def _run(self, multi_input):
+        args = self.args
+        # Read the configs, if there is no sol6 config the default one is used
+        config_cache = ConfigCache(args.cache_dir, __version__) if args.cache_dir else None
+        self.converter = Converter(args.path_config, args.path_config_sol6, prune=args.prune,
+                                   config_cache=config_cache)
+        self.variables = self.converter.variables
+        self.result_cache = self.make_result_cache(args)
+
+        if args.serve:
+            server = SolConServer(self, jobs=args.jobs, timeout=args.timeout)
+            server.serve(port=args.port, socket_path=args.socket)
+            return
+
+        if args.watch:
+            self.watch(args.watch, args.watch_interval)
+            return
+
+        if args.input_sets:
+            self.failed = self.convert_input_sets(args.file[0], args.input_sets, args.output)
+            return
 
+        if multi_input:
+            files = list(args.file or [])
+            if args.batch:
+                files += self.find_batch_files(args.batch)
+
+            if args.jobs > 1:
+                self.failed = self.parallel_convert(files, args.output, args.jobs)
+            else:
+                self.failed = self.batch_convert(files, args.output)
+            return
+
+        self.convert_output(args.file[0])
+
+    def _init_state(self):
+        self.variables = None
+        self.tosca_data = None
+        self.tosca_vnf = None
+        self.converter = None
+        self.provider = None
+        self.supported_providers = None
+        self.cnfv = None
+        self.result_cache = None
+        # The inputs, or the sets of input values, that failed to convert in a batch
+        self.failed = []
+        self.profiler = NO_PROFILER
         # Parse the yang specifications file into an empty dictionary
         self.parsed_dict = {}
 
+        self.desc = "NFVO SOL6 Converter (SolCon): Convert a SOL001 (TOSCA) YAML to SOL006 JSON"
+
+        self.supported_providers = Converter.supported_providers
+
+    @classmethod
+    def worker(cls, args, converter):
+        """
+        Build a SolCon that only holds the parsed arguments and the Converter, without converting
+        anything. Used by the --jobs worker processes and the server to convert a single file per task.
+        """
+        solcon = cls.__new__(cls)
+        solcon._init_state()
+        solcon.args = args
+        solcon.yaml = YamlBackend(args.yaml_backend)
+        solcon.json = JsonBackend(args.json_backend, compact=args.compact)
+        solcon.converter = converter
+        solcon.variables = converter.variables
+        solcon.result_cache = cls.make_result_cache(args)
+        return solcon
+
+    @staticmethod
+    def make_result_cache(args):
+        if not args.cache_dir or args.no_cache:
+            return None
+        return ResultCache(os.path.join(args.cache_dir, "results"), __version__,
+                           max_size=args.cache_size * 1024 * 1024)
+
+    def convert_output(self, file, output_file=None):
+        """
+        Convert a single file and output it. If the file was converted with the same configs and
+        settings before, the output is copied from the result cache without parsing or converting.
+        """
+        if self.result_cache is None:
+            self.convert_file(file)
+            self.output(output_file)
+            return
+        if output_file is None:
+            output_file = self.args.output
+
+        self.start_profile(file)
+        is_yaml = file.split(".")[-1].lower() == "yaml"
+        as_yaml = self.output_as_yaml(output_file)
+        with self.profiler.phase("read"):
+            data = self.read_file(file)
+
+        provider = self.args.provider.lower() if self.args.provider else None
+        key = self.converter.result_key(self.result_cache, data, is_yaml, provider,
+                                        "yaml" if as_yaml else self.json)
+        cached = self.result_cache.lookup(key)
+        if cached:
+            log.info("Using the cached conversion of {}".format(file))
+            with self.profiler.phase("serialize"):
+                self.copy_output(cached, output_file)
+            self.finish_profile()
+            return
+
+        with self.profiler.phase("parse"):
+            vnf = self.parse_input(data, is_yaml)
+        self.convert_vnf(vnf, data, is_yaml)
+        self.output(output_file)
+
+        if output_file:
+            self.result_cache.store_file(key, output_file)
+        else:
+            self.result_cache.store(key, self.format_output(as_yaml).encode("utf-8"))
+
+    def copy_output(self, cached, output_file):
+        if output_file:
+            abs_dir = os.path.dirname(os.path.abspath(output_file))
+            if not os.path.exists(abs_dir):
+                os.makedirs(abs_dir, exist_ok=True)
+            shutil.copyfile(cached, output_file)
+        elif not self.args.output_silent:
+            sys.stdout.flush()
+            with open(cached, "rb") as f:
+                shutil.copyfileobj(f, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+
+    def convert_file(self, file):
+        """
+        Convert a single TOSCA YAML or SOL6 JSON file.
+        The converted dict is stored in self.cnfv and returned.
+        """
+        self.start_profile(file)
+
+        # Determine if the file we're converting is tosca or sol6 based on the file extension
+        is_yaml = file.split(".")[-1].lower() == "yaml"
+        vnf, vnf_data = self.read_input_file(file, is_yaml, self.profiler)
+
+        return self.convert_vnf(vnf, vnf_data, is_yaml)
+
+    def convert_vnf(self, vnf, vnf_data, is_yaml):
+        """
+        Convert an already parsed TOSCA (is_yaml) or SOL6 VNF.
+        vnf_data is the raw input, it is only scanned for the provider if the parsed VNF doesn't have one.
+        """
         if is_yaml:
-            # Read the data from the provided yaml file into variables
-            self.tosca_vnf, self.tosca_lines = self.read_input_file(args.file, is_yaml)
+            self.tosca_vnf, self.tosca_data = vnf, vnf_data
 
             # Determine what provider to use
-            self.provider = self.find_provider(args.provider, self.tosca_lines,
-                                               self.supported_providers)
+            self.provider = self.find_provider(self.args.provider, self.tosca_vnf, self.tosca_data)
             if self.provider is None:
                 raise ValueError("The TOSCA provider could not be automatically found, pass it in"
                                  "manually.")
             self.provider = self.provider.lower()
 
-            # Initialize the proper converter object for the given provider
-            self.converter = self.initialize_converter(self.provider, self.supported_providers)
-
-            # Try to convert variables to their actual values
-            self.converter.convert_variables()
-
             # Do the actual converting logic
-            self.cnfv = self.converter.convert(provider=self.provider)
+            self.cnfv = self.converter.convert_tosca(self.tosca_vnf, provider=self.provider,
+                                                     profiler=self.profiler)
         else:
-            # Read the data from the provided json file into variables
-            self.sol6_vnf, self.sol6_lines = self.read_input_file(args.file, is_yaml)
-            converter = Sol1Converter(self.sol6_vnf, self.parsed_dict, self.variables)
-            self.cnfv = converter.convert()
+            self.sol6_vnf = vnf
+            self.cnfv = self.converter.convert_sol6(self.sol6_vnf, profiler=self.profiler)
 
-        self.output()
+        return self.cnfv
+
+    def batch_convert(self, files, output_dir):
+        """
+        Convert every file in this process, so the interpreter startup and the config parsing is
+        only paid once.
+        Each input is written to output_dir with the extension of the opposite format.
+        :return: A list of the files that failed to convert
+        """
+        if not files:
+            log.error("No YAML/JSON files found to convert")
+            return []
+
+        log.info("Batch converting {} files into {}".format(len(files), output_dir))
+        outputs, failed = self.batch_outputs(files, output_dir)
+        total = len(outputs) + len(failed)
+        for file, output_file in outputs:
+            try:
+                self.convert_output(file, output_file)
+            except Exception as e:
+                # Don't let a single bad VNFD stop the rest of the batch
+                log.error("Failed to convert '{}': {}".format(file, e))
+                failed.append(file)
+
+        log.info("Batch finished: {} converted, {} failed".format(total - len(failed), len(failed)))
+        return failed
+
+    def convert_input_sets(self, file, sets_file, output_dir):
+        """
+        Convert the TOSCA file once for every set of input values in sets_file. The file is read,
+        parsed and indexed once, each set is written to output_dir/<file name>-<set name>.json
+        :return: A list of the names of the sets that failed to convert
+        """
+        input_sets = load_input_sets(sets_file)
+        name = os.path.splitext(os.path.basename(file))[0]
+
+        self.start_profile(file)
+        self.tosca_vnf, self.tosca_data = self.read_input_file(file, True, self.profiler)
+        self.provider = self.find_provider(self.args.provider, self.tosca_vnf, self.tosca_data).lower()
+        template = InputIndex(self.tosca_vnf)
+        # Reading the template gets a profile of its own, every set gets one for its conversion
+        self.finish_profile()
+
+        log.info("Converting {} with {} sets of inputs into {}".format(file, len(input_sets), output_dir))
+        failed = []
+        for set_name, values in input_sets:
+            output_file = os.path.join(output_dir, "{}-{}.json".format(name, set_name))
+            self.start_profile("{}[{}]".format(file, set_name))
+            try:
+                self.cnfv = self.converter.convert_tosca_template(template, values, provider=self.provider,
+                                                                  profiler=self.profiler)
+                self.output(output_file)
+            except Exception as e:
+                # Don't let a single bad set stop the rest
+                log.error("Failed to convert '{}' with the inputs '{}': {}".format(file, set_name, e))
+                failed.append(set_name)
+
+        # Drop the profile of the last set if it failed
+        self.finish_profile(write=False)
+        log.info("Finished: {} converted, {} failed".format(len(input_sets) - len(failed), len(failed)))
+        return failed
+
+    def watch(self, directory, interval=0.5):
+        """
+        Reconvert the files in directory whose contents change, until interrupted. The configs stay
+        loaded, so only the changed file is read and converted.
+        TOSCA YAML files are written next to them as SOL6 JSON, and SOL6 JSON files as SOL1 YAML. A
+        JSON file is not converted over a YAML file of the same name, unless that was written here.
+        """
+        watcher = Watcher(directory, interval=interval)
+        # The outputs written by this watch, they are not converted back
+        written = set()
+        log.info("Watching {} for changed files".format(directory))
+        try:
+            for files in watcher.changes():
+                for file in files:
+                    if file in written:
+                        continue
+                    output_file = self.batch_output_path(file, directory)
+                    if output_file.endswith(".yaml") and os.path.exists(output_file) \
+                            and output_file not in written:
+                        log.warning("Not converting '{}', it would overwrite '{}'".format(file, output_file))
+                        continue
+
+                    try:
+                        self.convert_output(file, output_file)
+                    except Exception as e:
+                        # Keep watching, the file will most likely be fixed and saved again
+                        log.error("Failed to convert '{}': {}".format(file, e))
+                        continue
+                    written.add(output_file)
+                    watcher.record(output_file)
+                    log.info("Converted '{}' to '{}'".format(file, output_file))
+        except KeyboardInterrupt:
+            pass
+
+    def parallel_convert(self, files, output_dir, jobs):
+        """
+        Spread the files over a pool of worker processes. Every worker receives the Converter with the
+        merged config once when it starts, then converts a single file per task.
+        :return: A list of the files that failed to convert
+        """
+        if not files:
+            log.error("No YAML/JSON files found to convert")
+            return []
+
+        log.info("Converting {} files into {} with {} processes".format(len(files), output_dir, jobs))
+        outputs, failed = self.batch_outputs(files, output_dir)
+        total = len(outputs) + len(failed)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(self.args, self.converter)) as pool:
+            tasks = {pool.submit(_convert_worker, file, output_file): file for file, output_file in outputs}
+            for task in as_completed(tasks):
+                try:
+                    task.result()
+                except Exception as e:
+                    log.error("Failed to convert '{}': {}".format(tasks[task], e))
+                    failed.append(tasks[task])
+
+        log.info("Finished: {} converted, {} failed".format(total - len(failed), len(failed)))
+        return failed
 
     @staticmethod
-    def read_configs(tosca_config, sol6_config, sol6_is_file=True):
-        # Read the path configuration file
-        variables = toml.load(tosca_config)
-        if sol6_is_file:
-            variables_sol6 = toml.load(sol6_config)
+    def find_batch_files(batch):
+        """
+        A directory gives all the .yaml and .json files directly inside of it, anything else is
+        treated as a glob pattern
+        """
+        if os.path.isdir(batch):
+            files = [os.path.join(batch, f) for f in os.listdir(batch)
+                     if f.split(".")[-1].lower() in ["yaml", "json"]]
         else:
-            variables_sol6 = toml.loads(sol6_config)
+            files = glob.glob(batch)
+        return sorted(f for f in files if os.path.isfile(f))
 
-        return dict_utils.merge_two_dicts(variables, variables_sol6)
+    @classmethod
+    def batch_outputs(cls, files, output_dir):
+        """
+        Pair every file with its output path. Files that would be written to the same output, i.e.
+        a/x.yaml and b/x.yaml, are not converted, one would silently overwrite the other.
+        A file that is given more than once is only converted once.
+        :return: [(file, output file)], and the list of the files that collided
+        """
+        by_output = {}
+        for file in files:
+            inputs = by_output.setdefault(cls.batch_output_path(file, output_dir), [])
+            if not any(os.path.realpath(file) == os.path.realpath(other) for other in inputs):
+                inputs.append(file)
+
+        outputs = []
+        failed = []
+        for output_file, inputs in by_output.items():
+            if len(inputs) > 1:
+                log.error("Not converting {}, they would all be written to '{}'"
+                          .format(", ".join("'{}'".format(f) for f in inputs), output_file))
+                failed.extend(inputs)
+            else:
+                outputs.append((inputs[0], output_file))
+        return outputs, failed
 
-    def output(self):
-        output_lines = None
-        # Prune the empty fields
-        if self.args.prune:
-            self.cnfv = dict_utils.remove_empty_from_dict(self.cnfv)
+    @staticmethod
+    def batch_output_path(file, output_dir):
+        """
+        TOSCA YAML inputs become SOL6 JSON outputs, and SOL6 JSON inputs become SOL1 YAML outputs
+        """
+        name, ext = os.path.splitext(os.path.basename(file))
+        out_ext = ".json" if ext.lower() == ".yaml" else ".yaml"
+        return os.path.join(output_dir, name + out_ext)
+
+    def output(self, output_file=None):
+        if output_file is None:
+            output_file = self.args.output
+
+        as_yaml = self.output_as_yaml(output_file)
+        binary = not as_yaml and self.json.binary
+
+        # The output is serialized straight into the file, so serializing and writing is one phase
+        with self.profiler.phase("serialize"):
+            # Get the absolute path, since apparently relative paths sometimes have issues with things?
+            if output_file:
+                abs_path = os.path.abspath(output_file)
+                # Also python has a function for what I was sloppily doing, so use that
+                abs_dir = os.path.dirname(abs_path)
+                if not os.path.exists(abs_dir):
+                    os.makedirs(abs_dir, exist_ok=True)
+
+                with open(output_file, 'wb' if binary else 'w') as f:
+                    self.write_output(f, as_yaml)
+
+            if not output_file and not self.args.output_silent:
+                if binary:
+                    sys.stdout.flush()
+                    self.write_output(sys.stdout.buffer, as_yaml)
+                    sys.stdout.buffer.flush()
+                else:
+                    self.write_output(sys.stdout, as_yaml)
 
+        self.finish_profile()
+
+    @staticmethod
+    def output_as_yaml(output_file):
         # Output with yaml.dump if our output file is yaml
-        if self.args.output and self.args.output.split(".")[-1].lower() == "yaml":
-            output_lines = yaml.dump(self.cnfv, default_flow_style=False)
-        else:
-            # Put the data:esti-nfv:vnf tags at the base
-            cnfv = {'data': {'etsi-nfv-descriptors:nfv': self.cnfv}}
+        return bool(output_file) and output_file.split(".")[-1].lower() == "yaml"
 
-            output_lines = json.dumps(cnfv, indent=2)
+    def start_profile(self, file):
+        # Every file gets its own profile, written out once the file is output
+        if self.args.profile:
+            # A file that failed to convert never got to the output, drop its profile
+            self.finish_profile(write=False)
+            self.profiler = Profiler(name=file).start()
 
-        # Get the absolute path, since apparently relative paths sometimes have issues with things?
-        if self.args.output:
-            abs_path = os.path.abspath(self.args.output)
-            # Also python has a function for what I was sloppily doing, so use that
-            abs_dir = os.path.dirname(abs_path)
-            if not os.path.exists(abs_dir):
-                os.makedirs(abs_dir, exist_ok=True)
+    def finish_profile(self, write=True):
+        """
+        Stop the profile of the current file, and append it to the --profile file
+        """
+        if self.profiler is NO_PROFILER:
+            return
+        self.profiler.stop()
+        if write:
+            self.profiler.write(self.args.profile)
+        self.profiler = NO_PROFILER
 
-            with open(self.args.output, 'w') as f:
-                f.writelines(output_lines)
+    def write_output(self, f, as_yaml):
+        """
+        Write the converted dict as YAML or JSON to the file object f, it has to be opened in binary
+        mode for JSON if self.json.binary
+        """
+        if as_yaml:
+            self.yaml.dump(self.cnfv, stream=f, default_flow_style=False)
+        else:
+            self.json.dump(self.sol6_output(), f)
 
-        if not self.args.output and not self.args.output_silent:
-            sys.stdout.write(output_lines)
+    def format_output(self, as_yaml):
+        """
+        Return the converted dict as a YAML or JSON string
+        """
+        if as_yaml:
+            return self.yaml.dump(self.cnfv, default_flow_style=False)
+        return self.json.dumps(self.sol6_output())
 
-    @staticmethod
-    def read_input_file(file, is_yaml):
-        log.info("Reading TOSCA {} file {}".format("YAML" if is_yaml else "JSON", file))
-        f = open(file, 'rb')
-        file_read = f.read()
-        f.close()
-        f = open(file, 'rb')
-        file_lines = f.readlines()
-        f.close()
-        if is_yaml:
-            parsed = yaml.safe_load(file_read)
-        else:
-            parsed = json.loads(file_read)
+    def sol6_output(self):
+        # Put the data:esti-nfv:vnf tags at the base
+        return {'data': {'etsi-nfv-descriptors:nfv': self.cnfv}}
 
-        return parsed, file_lines
+    def read_input_file(self, file, is_yaml, profiler=NO_PROFILER):
+        """
+        Read the file once, and parse it from that buffer
+        :return: The parsed VNF and the raw bytes of the file
+        """
+        log.info("Reading TOSCA {} file {}".format("YAML" if is_yaml else "JSON", file))
+        with profiler.phase("read"):
+            file_read = self.read_file(file)
 
-    def initialize_converter(self, sel_provider, valid_providers):
-        # We found a proper provider, so we can start doing things
-        log.info("Starting conversion with provider '{}'".format(sel_provider))
-        return valid_providers[sel_provider](self.tosca_vnf, self.parsed_dict,
-                                             variables=self.variables)
+        with profiler.phase("parse"):
+            return self.parse_input(file_read, is_yaml), file_read
 
     @staticmethod
-    def find_provider(arg_provider, file_lines, valid_providers):
+    def read_file(file):
+        with open(file, 'rb') as f:
+            return f.read()
+
+    def parse_input(self, data, is_yaml):
+        if is_yaml:
+            return self.yaml.load(data)
+        return json.loads(data)
+
+    def find_provider(self, arg_provider, tosca_vnf, tosca_data):
         # Figure out what class we want to use
         # If it was specifically provided as a parameter
         if arg_provider:
             return arg_provider
-        else:
-            # Try to figure out what it is
-
-            sel_provider = "-".join(Sol6Converter.find_provider(file_lines).split(" "))
-
-            # If the provider is not a part of a valid provider, i.e. 'cisco' in ['cisco'],
-            # check if any of the valid providers are in the sel_provider,
-            #   i.e. 'cisco' in '&provider-cisco'
-            if sel_provider not in valid_providers:
-                for s_p in valid_providers:
-                    if s_p in sel_provider:
-                        return s_p
-                # No supported provider was found, try running it with the cisco one to see if it works, since
-                # the config files might have been edited
-                log.error("Unsupported provider: '{}', running with default provider 'cisco'. THIS WILL PROBABLY FAIL."
-                          .format(sel_provider))
-                sel_provider = 'cisco'
-            return sel_provider
+
+        # Try to figure out what it is, from the parsed VNF or else the raw file
+        return self.converter.find_provider(tosca_vnf, tosca_data)
 
     def interactive_mode(self):
         yn = ["y", "n"]
@@ -277,10 +674,8 @@ class SolCon:
             opt = self.valid_input("OK? (y/n)", yn)
             if opt == "y":
                 break
-        self.variables = self.read_configs(tosca_config, sol6_config, sol6_config_isfile)
-
-        # ** Parse the yang specifications file into an empty dictionary **
-        self.parsed_dict = {}
+        self.converter = Converter(tosca_config, sol6_config if sol6_config_isfile else None, prune=args.prune)
+        self.variables = self.converter.variables
 
         # Read the data from the provided yaml file into variables
         while True:
@@ -288,13 +683,13 @@ class SolCon:
                 print("Select input file")
                 tosca_file = self.valid_input_file("TOSCA input file (.yaml)")
             else:
-                tosca_file = args.file
+                tosca_file = args.file[0]
 
             print("TOSCA File: {}".format(tosca_file))
             opt = self.valid_input("OK? (y/n)", yn)
             if opt == "y":
                 break
-        self.tosca_vnf, self.tosca_lines = self.read_input_file(tosca_file)
+        self.tosca_vnf, self.tosca_data = self.read_input_file(tosca_file, True)
 
         # ** Output to a file (or not) **
         file_out = args.output
@@ -321,9 +716,8 @@ class SolCon:
             if not args.provider:
                 found_prov = None
                 try:
-                    found_prov = self.find_provider(None, self.tosca_lines,
-                                                    self.supported_providers)
-                except KeyError:
+                    found_prov = self.find_provider(None, self.tosca_vnf, self.tosca_data)
+                except (KeyError, ValueError):
                     pass
 
                 if found_prov:
@@ -342,13 +736,10 @@ class SolCon:
                     break
         self.provider = found_prov
 
-        # ** Initialize the proper converter object for the given provider **
-        self.converter = self.initialize_converter(self.provider, self.supported_providers)
-
-        # ** o the actual converting logic **
-        cnfv = self.converter.convert(provider=self.provider)
+        # ** Do the actual converting logic **
+        self.cnfv = self.converter.convert_tosca(self.tosca_vnf, provider=self.provider)
 
-        self.output(cnfv)
+        self.output()
 
     @staticmethod
     def valid_input_file(prompt):
@@ -379,6 +770,23 @@ class SolCon:
                 return opts[opts_l.index(choice.lower())]
 
 
+# The SolCon used by each --jobs worker process, created once by _init_worker
+_worker_solcon = None
+
+
+def _init_worker(args, converter):
+    global _worker_solcon
+    # Processes that weren't forked from the main one don't have logging set up yet
+    if not logging.getLogger().handlers:
+        setup_logger(args.log_level)
+    _worker_solcon = SolCon.worker(args, converter)
+
+
+def _convert_worker(file, output_file):
+    _worker_solcon.convert_output(file, output_file)
+    return output_file
+
+
 def setup_logger(log_level=logging.INFO):
     log_format = "%(levelname)s - %(message)s"
     log_folder = "logs"
@@ -396,4 +804,6 @@ def setup_logger(log_level=logging.INFO):
 
 
 if __name__ == '__main__':
-    SolCon()
+    # Let the scripts running a batch or the input sets know that some of it failed
+    if SolCon().failed:
+        sys.exit(1)
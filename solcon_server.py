@@ -0,0 +1,143 @@
+"""
+Long running conversion server for SolCon.
+
+The configs and the converter classes stay loaded between requests, so a conversion only pays for
+the actual converting and not for the interpreter startup and config parsing.
+It listens on localhost HTTP or on a Unix socket (HTTP over the socket), with the endpoints:
+
+    POST /tosca     TOSCA YAML body -> SOL6 JSON response
+    POST /sol6      SOL6 JSON body  -> SOL1 YAML response
+    GET  /health    Returns 200 if the server is up
+
+The provider can be given with the 'provider' query parameter, i.e. /tosca?provider=cisco
+"""
+import http.server
+import logging
+import os
+import socketserver
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import urlparse, parse_qs
+log = logging.getLogger(__name__)
+
+
+class SolConServer:
+    # Request path -> (input is yaml, response content type)
+    ROUTES = {
+        "/tosca": (True, "application/json"),
+        "/sol6": (False, "application/yaml")
+    }
+
+    def __init__(self, solcon, jobs=1, timeout=30):
+        """
+        :param solcon: A SolCon with the parsed arguments and the Converter
+        :param jobs: The maximum number of conversions that are run at the same time, the rest wait
+        :param timeout: Seconds a request can wait and run before it is answered with a timeout
+        """
+        self.solcon = solcon
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.httpd = None
+
+    def convert(self, data, is_yaml, provider=None):
+        """
+        Convert the raw TOSCA YAML (is_yaml) or SOL6 JSON input, and return the formatted output
+        """
+        solcon = self.solcon
+        # TOSCA is output as SOL6 JSON, SOL6 as SOL1 YAML. The Converter holds no per conversion
+        # state, so all the requests share it, and inputs that were converted before come from the
+        # result cache
+        return solcon.converter.convert_data(data, is_yaml, provider or solcon.args.provider,
+                                             result_cache=solcon.result_cache, yaml_backend=solcon.yaml,
+                                             json_backend=solcon.json)
+
+    def submit(self, data, is_yaml, provider=None):
+        """
+        Run the conversion on the bounded executor, raises TimeoutError if it doesn't finish in time.
+        Note: a conversion that has already started can't be stopped, it runs to the end in the
+        background but its result is thrown away.
+        """
+        task = self.executor.submit(self.convert, data, is_yaml, provider)
+        try:
+            return task.result(timeout=self.timeout)
+        except TimeoutError:
+            task.cancel()
+            raise
+
+    def serve(self, port=8080, socket_path=None, host="127.0.0.1"):
+        """
+        Serve until interrupted, on the Unix socket if it is given, otherwise on host:port
+        """
+        if socket_path:
+            # A socket left over from a previous run would make the bind fail
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.httpd = UnixHTTPServer(socket_path, ConversionHandler)
+            log.info("Serving conversions on unix socket {}".format(socket_path))
+        else:
+            self.httpd = http.server.ThreadingHTTPServer((host, port), ConversionHandler)
+            log.info("Serving conversions on http://{}:{}".format(host, port))
+        self.httpd.solcon_server = self
+
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+            self.executor.shutdown(wait=False)
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ConversionHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._respond(200, "OK\n", "text/plain")
+        else:
+            self._respond(404, "Unknown path {}\n".format(self.path), "text/plain")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in SolConServer.ROUTES:
+            self._respond(404, "Unknown path {}\n".format(self.path), "text/plain")
+            return
+        is_yaml, content_type = SolConServer.ROUTES[url.path]
+
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0:
+            self._respond(400, "Missing request body\n", "text/plain")
+            return
+        data = self.rfile.read(length)
+        provider = parse_qs(url.query).get("provider", [None])[0]
+
+        try:
+            result = self.server.solcon_server.submit(data, is_yaml, provider)
+        except TimeoutError:
+            self._respond(504, "Conversion timed out\n", "text/plain")
+            return
+        except Exception as e:
+            log.error("Failed to convert request: {}".format(e))
+            self._respond(422, "Conversion failed: {}\n".format(e), "text/plain")
+            return
+
+        self._respond(200, result, content_type)
+
+    def _respond(self, code, body, content_type):
+        body = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients don't have an address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        log.debug("{} - {}".format(self.address_string(), format % args))
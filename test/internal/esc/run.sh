@@ -9,9 +9,7 @@ output_dir=$root/outputs/esc
 config_tosca=$root/config/config-esc.toml
 example_root=$root/examples/esc
 
-for filename in $example_root/*.yaml; do
-    file=$(basename $filename)
-    echo Run $file
-    python3 $tosca -f $filename -o "$output_dir/${file%.yaml}.json" -c $config_tosca -r cisco --log-level INFO
-done
+# Convert all of the examples in a single process, so startup and config parsing is only done once
+echo Run $example_root/*.yaml
+python3 $tosca -b "$example_root/*.yaml" -o $output_dir -c $config_tosca -r cisco --log-level INFO
 
@@ -0,0 +1,27 @@
+import unittest
+from converters.append_buffer import AppendBuffer
+
+
+class TestAppendBuffer(unittest.TestCase):
+
+    def test_flush(self):
+        buffer = AppendBuffer()
+        self.assertFalse(buffer)
+        buffer.append("a", 1, 0)
+        buffer.append("b", 2, 0)
+        buffer.append("a", 3, 1)
+        buffer.write_always("b")
+        self.assertTrue(buffer)
+
+        # The args of the last append are kept
+        self.assertEqual(list(buffer.flush()), [("a", [1, 3], (1,), False), ("b", [2], (0,), True)])
+        self.assertFalse(buffer)
+        self.assertEqual(buffer.always, set())
+
+    def test_extend(self):
+        self.assertEqual(AppendBuffer.extend(None, [1, 2]), [1, 2])
+        self.assertEqual(AppendBuffer.extend("x", [1]), ["x", 1])
+
+        cur_list = ["x"]
+        self.assertIs(AppendBuffer.extend(cur_list, [1]), cur_list)
+        self.assertEqual(cur_list, ["x", 1])
@@ -0,0 +1,124 @@
+import copy
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import toml
+import yaml
+from utils.util import Util
+from converters.converter import Converter
+from converters.sol6_converter import Sol6Converter
+from converters.sol1_converter import Sol1Converter
+from keys.sol6_keys import V2MapBase
+from utils.config_cache import ConfigCache
+
+
+class TestConverter(unittest.TestCase):
+
+    # Build the session and read the input once, like an embedding program would
+    @classmethod
+    def setUpClass(cls):
+        cls.converter = Converter("{}config/config-esc.toml".format(Util.root))
+        with open("{}test-input.yaml".format(Util.root)) as f:
+            cls.tosca_vnf = yaml.safe_load(f)
+
+    def test_convert_tosca(self):
+        vnfd = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        self.assertEqual(vnfd["vnfd"]["id"], "VNF-test")
+        self.assertEqual(len(vnfd["vnfd"]["vdu"]), 1)
+
+    def test_virtual_link_node(self):
+        # The extended requirement form, virtual_link: {node: name}
+        tosca_vnf = copy.deepcopy(self.tosca_vnf)
+        node_templates = tosca_vnf["topology_template"]["node_templates"]
+        for nic in ("vdu1_nic0", "vdu1_nic1"):
+            node_templates[nic] = {"type": "cisco.nodes.nfv.VduCp",
+                                   "properties": {"layer_protocols": ["ipv4"]},
+                                   "requirements": [{"virtual_binding": "vdu1"},
+                                                    {"virtual_link": {"node": "int_vl"}}]}
+        node_templates["vdu1_nic2"] = {"type": "cisco.nodes.nfv.VduCp",
+                                       "requirements": [{"virtual_binding": "vdu1"}]}
+        tosca_vnf["topology_template"]["substitution_mappings"] = {
+            "requirements": [{"virtual_link": ["vdu1_nic2", "virtual_link"]}]}
+
+        vnfd = self.converter.convert_tosca(tosca_vnf)["vnfd"]
+        int_cpds = vnfd["vdu"][0]["int-cpd"]
+        self.assertEqual(int_cpds[0]["int-virtual-link-desc"], {"node": "int_vl"})
+        # The link both CPs use is only created once
+        self.assertEqual(len(vnfd["int-virtual-link-desc"]), 2)
+
+    def test_virtual_binding_node(self):
+        # The extended requirement form, virtual_binding: {node: name}
+        tosca_vnf = copy.deepcopy(self.tosca_vnf)
+        node_templates = tosca_vnf["topology_template"]["node_templates"]
+        node_templates["vdu1_nic0"] = {"type": "cisco.nodes.nfv.VduCp",
+                                       "requirements": [{"virtual_binding": {"node": "vdu1"}}]}
+        node_templates["vdu1_nic1"] = {"type": "cisco.nodes.nfv.VduCp",
+                                       "requirements": [{"virtual_binding": "vdu1"}]}
+        tosca_vnf["topology_template"]["substitution_mappings"] = {
+            "requirements": [{"virtual_link": ["vdu1_nic1", "virtual_link"]}]}
+
+        vnfd = self.converter.convert_tosca(tosca_vnf)["vnfd"]
+        # The CP isn't bound to a VDU it can find, so it is left out of the VDUs
+        self.assertEqual([cp["id"] for cp in vnfd["vdu"][0]["int-cpd"]], ["vdu1_nic1"])
+
+    def test_append_notlist(self):
+        # A mapping without MapElems writes its appended list even if the transforms leave it empty
+        vnfd = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        vnfd["vnfd"]["empty"] = ""
+        converter = Sol1Converter({"data": {"etsi-nfv-descriptors:nfv": vnfd}}, {}, self.converter.variables)
+        converter.mapping = [(("a;b", (V2MapBase.FLAG_APPEND_LIST, V2MapBase.FLAG_LIST_FIRST)), "vnfd;empty")]
+        converter.run_mapping()
+        self.assertEqual(converter.sol1_vnfd, {"a": {"b": ""}})
+
+    def test_find_provider(self):
+        self.assertEqual(self.converter.find_provider(self.tosca_vnf), "cisco")
+
+    def test_scan_provider(self):
+        data = b"a: 1\n  b:\n    provider: Cisco\r\n    c: 2\n"
+        self.assertEqual(Sol6Converter.find_provider(data), "cisco")
+        self.assertEqual(Sol6Converter.find_provider(data.splitlines(keepends=True)), "cisco")
+        with self.assertRaises(ValueError):
+            Sol6Converter.find_provider(b"a: 1\n")
+
+    def test_repeated_conversions(self):
+        first = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        second = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf), provider="cisco")
+        self.assertEqual(first, second)
+
+    def test_convert_sol6(self):
+        vnfd = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        sol1 = self.converter.convert_sol6({"data": {"etsi-nfv-descriptors:nfv": vnfd}})
+        self.assertIn("vdu1", sol1["topology_template"]["node_templates"])
+
+    def test_shared_variables(self):
+        # The conversions only read the session's variables, so they can run at the same time
+        variables = copy.deepcopy(self.converter.variables)
+        vnfd = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        self.converter.convert_sol6({"data": {"etsi-nfv-descriptors:nfv": vnfd}})
+        self.assertEqual(self.converter.variables, variables)
+
+    def test_threads(self):
+        expected = self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf)),
+                                    range(8)))
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_config_dicts(self):
+        converter = Converter(toml.load("{}config/config-esc.toml".format(Util.root)))
+        self.assertEqual(converter.variables, self.converter.variables)
+
+    def test_config_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ConfigCache(cache_dir, "test")
+            config = "{}config/config-esc.toml".format(Util.root)
+            first = Converter(config, config_cache=cache)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            second = Converter(config, config_cache=cache)
+            self.assertEqual(first.variables, second.variables)
+
+            # A different version is a different entry
+            Converter(config, config_cache=ConfigCache(cache_dir, "other"))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
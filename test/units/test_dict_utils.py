@@ -0,0 +1,71 @@
+import pickle
+import unittest
+from utils.dict_utils import Path, compile_path, compile_template, get_path_value, set_path_to, remove_empty_from_dict
+from utils.key_utils import KeyUtils
+
+
+class TestPath(unittest.TestCase):
+
+    def test_compile(self):
+        path = compile_path("vnfd;vdu;0;id")
+        self.assertEqual(path, "vnfd;vdu;0;id")
+        self.assertEqual(path.keys, ("vnfd", "vdu", "0", "id"))
+        self.assertEqual(path.indexes, (None, None, 0, None))
+        # Compiled once, then reused
+        self.assertIs(compile_path("vnfd;vdu;0;id"), path)
+        self.assertIs(compile_path(path), path)
+
+    def test_pickle(self):
+        path = pickle.loads(pickle.dumps(Path("a;1;b")))
+        self.assertEqual(path.indexes, (None, 1, None))
+
+    def test_template(self):
+        template = compile_template("vnfd;vdu;{};cp;{};id")
+        self.assertEqual(template.slots, (4, 2))
+        path = template.fill([1, "c1"])
+        self.assertEqual(path, "vnfd;vdu;c1;cp;1;id")
+        self.assertEqual(path.indexes, (None, None, None, None, 1, None))
+        self.assertEqual(template.fill([""]), "vnfd;vdu;{};cp;;id")
+        # A value with its own keys is split as well
+        self.assertEqual(template.fill(["a;2"]).keys, ("vnfd", "vdu", "{}", "cp", "a", "2", "id"))
+        # The placeholders before it are still filled
+        path = template.fill(["a;2", 3])
+        self.assertEqual(path.keys, ("vnfd", "vdu", "3", "cp", "a", "2", "id"))
+        self.assertEqual(path.indexes, (None, None, 3, None, None, 2, None))
+        self.assertIs(compile_template("a;b").fill([]), compile_path("a;b"))
+
+    def test_get_set(self):
+        d = {}
+        set_path_to("a;b;1;c", d, "x", create_missing=True)
+        self.assertEqual(d, {"a": {"b": [None, {"c": "x"}]}})
+        self.assertEqual(get_path_value(Path("a;b;1;c"), d), "x")
+        self.assertEqual(get_path_value("a;b;1;c", d), "x")
+        self.assertFalse(get_path_value("a;d", d, must_exist=False, no_msg=True))
+        with self.assertRaises(KeyError):
+            get_path_value("a;d", d)
+
+    def test_key_utils(self):
+        path = Path("a;b;c;d")
+        self.assertEqual(KeyUtils.get_path_last(path, 2), "c;d")
+        self.assertEqual(KeyUtils.remove_path_first(path), "b;c;d")
+        self.assertEqual(KeyUtils.remove_path_elem(path, 1), "a;c;d")
+        self.assertEqual(KeyUtils.get_path_level(path), 4)
+
+
+class TestRemoveEmpty(unittest.TestCase):
+
+    def setUp(self):
+        self.d = {"a": {"b": None, "c": "", "d": {"e": [{}], "f": []}},
+                  "g": [0, False, None, "", {"h": {}}, [[]], "x"],
+                  "i": 0, "j": False, "k": 0.0, "l": {"m": [{"n": 1, "o": None}]}}
+        self.expected = {"g": [0, False, "x"], "i": 0, "j": False, "l": {"m": [{"n": 1}]}}
+
+    def test_prune(self):
+        self.assertEqual(remove_empty_from_dict(self.d), self.expected)
+        # The input is left alone
+        self.assertIsNone(self.d["a"]["b"])
+
+    def test_in_place(self):
+        pruned = remove_empty_from_dict(self.d, in_place=True)
+        self.assertIs(pruned, self.d)
+        self.assertEqual(self.d, self.expected)
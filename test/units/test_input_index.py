@@ -0,0 +1,49 @@
+import unittest
+from utils.input_index import InputIndex
+from mapping_v2 import V2Mapping
+
+
+class TestInputIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.flavor = {"get_input": "FLAVOR"}
+        self.tosca = {
+            "inputs": {"FLAVOR": {"type": "string"}, "KEY": {"type": "string"}},
+            "vdu": {"flavor": self.flavor,
+                    "meta": [{"get_input": "KEY"}, "plain", [{"get_input": "FLAVOR"}]],
+                    "nested": {"a": {"b": {"get_input": "KEY"}}}}
+        }
+
+    def test_index(self):
+        index = InputIndex(self.tosca)
+        self.assertEqual(len(index.by_name["FLAVOR"]), 2)
+        self.assertEqual(len(index.by_name["KEY"]), 2)
+
+    def test_substitute(self):
+        index = InputIndex(self.tosca)
+        self.assertEqual(index.substitute({"KEY": "key-1", "OTHER": "x"}), 2)
+        vdu = self.tosca["vdu"]
+        # Also the inputs in lists and further down are replaced
+        self.assertEqual(vdu["meta"][0], "key-1")
+        self.assertEqual(vdu["nested"]["a"]["b"], "key-1")
+        self.assertEqual(vdu["meta"][2][0], {"get_input": "FLAVOR"})
+        self.assertNotIn("KEY", index.by_name)
+
+    def test_specialize(self):
+        template = InputIndex(self.tosca)
+        vnf, index = template.specialize({"FLAVOR": "small"})
+        self.assertEqual(vnf["vdu"]["flavor"], "small")
+        self.assertEqual(vnf["vdu"]["meta"][2][0], "small")
+        self.assertEqual(vnf["vdu"]["meta"][0], {"get_input": "KEY"})
+        # The template is left alone, and the copy has an index of its own
+        self.assertIs(self.tosca["vdu"]["flavor"], self.flavor)
+        self.assertNotIn("FLAVOR", index.by_name)
+        self.assertEqual(index.substitute({"KEY": "key-1"}), 2)
+        self.assertEqual(vnf["vdu"]["nested"]["a"]["b"], "key-1")
+        self.assertEqual(self.tosca["vdu"]["nested"]["a"]["b"], {"get_input": "KEY"})
+
+    def test_get_input_values(self):
+        mapping = V2Mapping(self.tosca, {})
+        values = mapping.get_input_values([self.flavor, {"get_input": "KEY"}, "value"], self.tosca["inputs"])
+        self.assertEqual(values, [{"FLAVOR": {"type": "string"}}, {"KEY": {"type": "string"}}, "value"])
+        self.assertEqual(mapping.get_input_values([self.flavor], None), [])
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+import yaml
+from utils.util import Util
+from utils.input_index import InputIndex
+from utils.input_sets import load_input_sets
+from converters.converter import Converter
+
+
+class TestInputSets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(data)
+        return path
+
+    def test_toml(self):
+        path = self.write("sets.toml", '[site-a]\nVIM_FLAVOR = "small"\n[site-b]\nVIM_FLAVOR = "large"\n')
+        self.assertEqual(load_input_sets(path), [("site-a", {"VIM_FLAVOR": "small"}),
+                                                 ("site-b", {"VIM_FLAVOR": "large"})])
+
+    def test_json(self):
+        path = self.write("sets.json", json.dumps([{"VIM_FLAVOR": "small"}, {}]))
+        self.assertEqual(load_input_sets(path), [("1", {"VIM_FLAVOR": "small"}), ("2", {})])
+        with self.assertRaises(ValueError):
+            load_input_sets(self.write("bad.json", json.dumps({"site-a": "small"})))
+
+    def test_csv(self):
+        path = self.write("sets.csv", "name,VIM_FLAVOR,KEY\nsite-a,small,\n,large,k\n")
+        self.assertEqual(load_input_sets(path), [("site-a", {"VIM_FLAVOR": "small"}),
+                                                 ("2", {"VIM_FLAVOR": "large", "KEY": "k"})])
+
+    def test_names(self):
+        for name in ("../x", "a/b", "..", ""):
+            with self.assertRaises(ValueError):
+                load_input_sets(self.write("sets.json", json.dumps({name: {}})))
+        self.assertEqual(load_input_sets(self.write("sets.json", json.dumps({"site.a": {}}))), [("site.a", {})])
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            load_input_sets(self.write("sets.txt", ""))
+
+
+class TestConvertTemplate(unittest.TestCase):
+
+    def test_convert_template(self):
+        converter = Converter("{}config/config-esc.toml".format(Util.root))
+        with open("{}test-input.yaml".format(Util.root)) as f:
+            tosca_vnf = yaml.safe_load(f)
+        template = InputIndex(tosca_vnf)
+
+        first = converter.convert_tosca_template(template, {})
+        second = converter.convert_tosca_template(template, {})
+        self.assertEqual(first, second)
+        self.assertEqual(first, converter.convert_tosca(yaml.safe_load(yaml.safe_dump(tosca_vnf))))
@@ -0,0 +1,31 @@
+import io
+import json
+import unittest
+from utils.json_backend import JsonBackend, orjson
+
+
+class TestJsonBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {"data": {"vnfd": {"id": "VNF", "vdu": [{"id": "c1", "int-cpd": []}], "n": 0}}}
+
+    def test_python(self):
+        f = io.StringIO()
+        JsonBackend().dump(self.data, f)
+        self.assertEqual(f.getvalue(), json.dumps(self.data, indent=2))
+        self.assertEqual(JsonBackend().dumps(self.data), f.getvalue())
+
+    def test_compact(self):
+        out = JsonBackend(compact=True).dumps(self.data)
+        self.assertNotIn(" ", out)
+        self.assertEqual(json.loads(out), self.data)
+
+    @unittest.skipUnless(orjson, "orjson is not installed")
+    def test_orjson(self):
+        backend = JsonBackend("orjson")
+        self.assertTrue(backend.binary)
+        f = io.BytesIO()
+        backend.dump(self.data, f)
+        self.assertEqual(f.getvalue().decode("utf-8"), json.dumps(self.data, indent=2))
+        self.assertEqual(JsonBackend("orjson", compact=True).dumps(self.data),
+                         JsonBackend(compact=True).dumps(self.data))
@@ -0,0 +1,76 @@
+import unittest
+from mapping_v2 import V2Mapping, MapElem, MapIndex
+from keys.sol6_keys_cisco import V2Map
+
+
+class TestMapIndex(unittest.TestCase):
+
+    def test_first_match(self):
+        first = MapElem("c1", 0)
+        index = MapIndex([first, MapElem("c2", 1), MapElem("c1", 2)])
+        self.assertIs(index.get("c1"), first)
+        self.assertIsNone(index.get("c3"))
+        self.assertIsNone(MapIndex(None).get("c1"))
+        # The extended form {node: name} doesn't match a name, and doesn't fail to look up
+        self.assertIsNone(index.get({"node": "c1"}))
+        node = MapElem({"node": "c1"}, 3)
+        self.assertIs(MapIndex([first, node]).get({"node": "c1"}), node)
+
+    def test_map_ints(self):
+        vdus = V2Mapping.map_ints(["c1", "c2"])
+        cps = V2Mapping.map_ints(["c2", "c1", "c3"], parent_map=vdus)
+        self.assertEqual([cp.parent_map for cp in cps], [vdus[1], vdus[0], None])
+
+        values = V2Mapping.map_ints(["a", "b"], value_map=MapElem.basic_map_list(1))
+        self.assertEqual(values[0].parent_map.name, 0)
+        self.assertIsNone(values[1].parent_map)
+
+    def test_parent_match(self):
+        vdus = V2Mapping.map_ints(["c1", "c2"])
+        cps = V2Mapping.parent_match(["nic0", "nic1"], parent_map=vdus,
+                                     value_dict={"nic0": "c2", "nic1": "c1"})
+        self.assertEqual([cp.parent_map for cp in cps], [vdus[1], vdus[0]])
+
+
+class TestMapElem(unittest.TestCase):
+
+    def test_copy(self):
+        parent = MapElem("c1", 0, MapElem("vnf", 0))
+        elem = MapElem("nic0", 1, parent)
+        copied = elem.copy()
+        self.assertIsNot(copied, elem)
+        # The parent chain is shared instead of copied
+        self.assertIs(copied.parent_map, parent)
+        copied.cur_map = 2
+        self.assertEqual(elem.cur_map, 1)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            MapElem("c1", 0).other = 1
+
+
+class TestFormatPath(unittest.TestCase):
+
+    def test_format_path(self):
+        elem = MapElem("nic0", 1, MapElem("c1", None, MapElem("vnf", 0)))
+        path = "a;{};b;{};c"
+        # The None value is skipped, so the next parent fills the entry
+        self.assertEqual(MapElem.format_path(elem, path), "a;0;b;1;c")
+        self.assertEqual(MapElem.format_path(elem, path, use_value=False), "a;c1;b;nic0;c")
+        self.assertEqual(MapElem.format_path(elem, path).indexes, (None, 0, None, 1, None))
+        # Running out of parents leaves the rest of the entries
+        self.assertEqual(MapElem.format_path(MapElem("nic0", 1), "{};{};{}"), "{};;1")
+        self.assertEqual(MapElem.format_path(None, "a;{}"), "a;")
+        # A value with its own keys doesn't stop the outer entries from being filled
+        self.assertEqual(MapElem.format_path(MapElem("a", "x;y", MapElem("b", 3)), "r;{};m;{};z"),
+                         "r;3;m;x;y;z")
+
+
+class TestClassifyCps(unittest.TestCase):
+
+    def test_classify(self):
+        cps = V2Mapping.map_ints(["nic0", "nic1", "nic2", "nic3"])
+        int_cps, mgmt_cps, orch_cps = V2Map.classify_cps(cps, ["nic1", "nic2"], [MapElem("nic1", 0)])
+        self.assertEqual([m.name for m in int_cps], ["nic0", "nic3"])
+        self.assertEqual([m.name for m in mgmt_cps], ["nic1"])
+        self.assertEqual([m.name for m in orch_cps], ["nic2"])
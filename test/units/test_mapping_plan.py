@@ -0,0 +1,74 @@
+import unittest
+from converters.sol6_converter_cisco import SOL6ConverterCisco
+from keys.sol6_keys_cisco import V2Map
+
+
+class FlagHolder:
+    def __init__(self):
+        self.flag_mask = 0
+        for _, attr in SOL6ConverterCisco.flag_attrs:
+            setattr(self, attr, False)
+
+
+class TestMappingPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.plan = SOL6ConverterCisco.new_mapping_plan()
+        self.holder = FlagHolder()
+
+    def test_entry_reused(self):
+        flags = (V2Map.FLAG_ONLY_NUMBERS, V2Map.FLAG_VAR)
+        entry = self.plan.entry(V2Map, "a;{}", flags, ["b;{}", []])
+        self.assertEqual(entry.sol6_path.keys, ("b", "{}"))
+        self.assertIs(self.plan.entry(V2Map, "a;{}", flags, ["b;{}", ["other"]]), entry)
+
+    def test_entry_set_value(self):
+        # The value can come from the document, so these entries aren't kept
+        for vnf_id in ("VNF-1", "VNF-2"):
+            entry = self.plan.entry(V2Map, "a;{}", V2Map.FLAG_KEY_SET_VALUE, ["{}_VDU".format(vnf_id), []])
+            self.assertEqual(entry.sol6_path.keys, ("{}_VDU".format(vnf_id),))
+        self.assertEqual(self.plan._entries, {})
+
+    def test_apply(self):
+        self.plan.apply(self.holder, self.plan.mask((V2Map.FLAG_ONLY_NUMBERS, V2Map.FLAG_VAR), V2Map))
+        self.assertTrue(self.holder.only_number)
+        self.assertTrue(self.holder.is_variable)
+        self.assertFalse(self.holder.key_as_value)
+
+        # The next mapping resets the flags it doesn't have
+        self.plan.apply(self.holder, self.plan.mask(V2Map.FLAG_KEY_SET_VALUE, V2Map))
+        self.assertFalse(self.holder.only_number)
+        self.assertFalse(self.holder.is_variable)
+        self.assertTrue(self.holder.key_as_value)
+
+    def test_sticky(self):
+        self.plan.apply(self.holder, self.plan.mask(V2Map.FLAG_LIST_NTH, V2Map))
+        self.plan.apply(self.holder, self.plan.mask(V2Map.FLAG_BLANK, V2Map))
+        self.assertTrue(self.holder.nth_list_elem)
+
+    def test_transforms(self):
+        # Only the null check runs without flags
+        self.assertEqual(self.plan.transforms(0), ("_flag_check_for_null",))
+
+        mask = self.plan.mask((V2Map.FLAG_VAR, V2Map.FLAG_ONLY_NUMBERS, V2Map.FLAG_KEY_SET_VALUE), V2Map)
+        self.assertEqual(self.plan.transforms(mask),
+                         ("_flag_only_number", "_flag_check_for_null", "_flag_handle_input"))
+
+    def test_pipeline(self):
+        self.holder.flag_pipelines = {}
+        # Stand-ins for the bound methods
+        for _, name in SOL6ConverterCisco.flag_transforms:
+            setattr(self.holder, name, name)
+        self.plan.apply(self.holder, self.plan.mask(V2Map.FLAG_MIN_1, V2Map))
+        pipeline = self.plan.pipeline(self.holder)
+        self.assertEqual(pipeline, ("_flag_min_1", "_flag_check_for_null"))
+        self.assertIs(self.plan.pipeline(self.holder), pipeline)
+
+    def test_pipeline_after(self):
+        self.holder.flag_pipelines = {}
+        for _, name in SOL6ConverterCisco.flag_transforms:
+            setattr(self.holder, name, name)
+        self.plan.apply(self.holder, self.plan.mask((V2Map.FLAG_APPEND_LIST, V2Map.FLAG_FORMAT_IP), V2Map))
+        self.assertEqual(self.plan.pipeline_after(self.holder, "_flag_append_to_list"),
+                         ("_flag_format_as_ip", "_flag_check_for_null"))
+        self.assertEqual(self.plan.pipeline_after(self.holder, "_flag_min_1"), ())
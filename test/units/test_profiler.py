@@ -0,0 +1,40 @@
+import copy
+import unittest
+import yaml
+from utils.util import Util
+from converters.converter import Converter
+from utils.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.converter = Converter("{}config/config-esc.toml".format(Util.root))
+        with open("{}test-input.yaml".format(Util.root)) as f:
+            cls.tosca_vnf = yaml.safe_load(f)
+
+    def test_phases(self):
+        profiler = Profiler(name="test").start()
+        self.converter.convert_tosca(copy.deepcopy(self.tosca_vnf), profiler=profiler)
+        profiler.stop()
+
+        report = profiler.report()
+        self.assertEqual(report["name"], "test")
+        self.assertEqual(list(report["phases"]),
+                         ["convert_variables", "set_variables", "v2map", "run_mapping", "prune"])
+        for phase in report["phases"].values():
+            self.assertEqual(phase["calls"], 1)
+            self.assertGreaterEqual(phase["peak_bytes"], 0)
+
+    def test_nested_peak(self):
+        profiler = Profiler().start()
+        with profiler.phase("outer"):
+            with profiler.phase("inner"):
+                data = [0] * 100000
+            del data
+        profiler.stop()
+        phases = profiler.report()["phases"]
+        self.assertGreater(phases["inner"]["peak_bytes"], 0)
+        # The peak of the inner phase is also the peak of the outer one
+        self.assertGreaterEqual(phases["outer"]["peak_bytes"], phases["inner"]["peak_bytes"])
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.util import Util
+from utils.result_cache import ResultCache
+from converters.converter import Converter
+from utils.json_backend import JsonBackend
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.tmp.name, "1.0")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key(self):
+        key = self.cache.key(b"data", "digest", "cisco", True, "yaml")
+        self.assertEqual(key, self.cache.key(b"data", "digest", "cisco", True, "yaml"))
+        self.assertNotEqual(key, self.cache.key(b"data2", "digest", "cisco", True, "yaml"))
+        self.assertNotEqual(key, self.cache.key(b"data", "digest", "cisco", False, "yaml"))
+        self.assertNotEqual(key, self.cache.key(b"data", "digest", "cisco", True, "json-python"))
+        self.assertNotEqual(key, ResultCache(self.tmp.name, "1.1").key(b"data", "digest", "cisco", True, "yaml"))
+
+    def test_store_load(self):
+        self.assertIsNone(self.cache.load("a"))
+        self.cache.store("a", b"output")
+        self.assertEqual(self.cache.load("a"), b"output")
+
+        src = os.path.join(self.tmp.name, "out.json")
+        with open(src, "wb") as f:
+            f.write(b"file output")
+        self.cache.store_file("b", src)
+        with open(self.cache.lookup("b"), "rb") as f:
+            self.assertEqual(f.read(), b"file output")
+
+    def test_evict(self):
+        self.cache.max_size = 10
+        for i, key in enumerate(["a", "b", "c"]):
+            self.cache.store(key, b"12345")
+            os.utime(self.cache.path(key), (i, i))
+        self.cache.evict()
+        # Only the most recently used entries that fit are kept
+        self.assertIsNone(self.cache.load("a"))
+        self.assertEqual(self.cache.load("c"), b"12345")
+
+
+class TestConvertData(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.converter = Converter("{}config/config-esc.toml".format(Util.root))
+        with open("{}test-input.yaml".format(Util.root), "rb") as f:
+            cls.data = f.read()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.tmp.name, "1.0")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_result_key(self):
+        # The same bytes converted in the other direction are a different result
+        key = self.converter.result_key(self.cache, self.data, True, None, "yaml")
+        self.assertEqual(key, self.converter.result_key(self.cache, self.data, True, None, "yaml"))
+        self.assertNotEqual(key, self.converter.result_key(self.cache, self.data, False, None, "yaml"))
+
+    def test_convert_data(self):
+        output = self.converter.convert_data(self.data, True)
+        vnfd = json.loads(output)["data"]["etsi-nfv-descriptors:nfv"]["vnfd"]
+        self.assertEqual(vnfd["id"], "VNF-test")
+
+    def test_cached(self):
+        first = self.converter.convert_data(self.data, True, result_cache=self.cache)
+        with mock.patch.object(Converter, "convert_tosca") as convert:
+            second = self.converter.convert_data(self.data, True, result_cache=self.cache)
+            convert.assert_not_called()
+        self.assertEqual(first, second)
+
+        # A different output format is converted again
+        compact = self.converter.convert_data(self.data, True, result_cache=self.cache,
+                                              json_backend=JsonBackend(compact=True))
+        self.assertNotEqual(first, compact)
+        self.assertEqual(json.loads(first), json.loads(compact))
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.util import Util
+from solcon import SolCon
+from converters.converter import Converter
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def batch(self, files, jobs=1):
+        return SolCon(internal_run=True, internal_args={
+            "f": files, "o": self.tmp.name, "c": "{}config/config-esc.toml".format(Util.root),
+            "r": None, "l": 50, "e": True, "j": jobs, "no_cache": True})
+
+    def test_batch(self):
+        solcon = self.batch(["{}test-input.yaml".format(Util.root)] * 2)
+        self.assertEqual(solcon.failed, [])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "test-input.json")))
+
+    def test_batch_failed(self):
+        bad = os.path.join(self.tmp.name, "bad.yaml")
+        with open(bad, "w") as f:
+            f.write("topology_template: [\n")
+        for jobs in (1, 2):
+            # An internal run isn't exited, the failed files are kept for the caller
+            solcon = self.batch(["{}test-input.yaml".format(Util.root), bad], jobs=jobs)
+            self.assertEqual(solcon.failed, [bad])
+
+    def test_batch_outputs(self):
+        outputs, failed = SolCon.batch_outputs(["a/x.yaml", "b/x.yaml", "a/y.json", "a/y.json"], "out")
+        self.assertEqual(outputs, [("a/y.json", os.path.join("out", "y.yaml"))])
+        self.assertEqual(failed, ["a/x.yaml", "b/x.yaml"])
+
+
+class TestInputSets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sets = os.path.join(self.tmp.name, "sets.json")
+        with open(self.sets, "w") as f:
+            json.dump({"site-a": {}, "site-b": {}}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def convert(self):
+        return SolCon(internal_run=True, internal_args={
+            "f": ["{}test-input.yaml".format(Util.root)], "o": self.tmp.name,
+            "c": "{}config/config-esc.toml".format(Util.root), "r": None, "l": 50, "e": True,
+            "input_sets": self.sets})
+
+    def test_input_sets(self):
+        self.assertEqual(self.convert().failed, [])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "test-input-site-b.json")))
+
+    def test_input_sets_failed(self):
+        with mock.patch.object(Converter, "convert_tosca_template", side_effect=ValueError("bad")):
+            self.assertEqual(self.convert().failed, ["site-a", "site-b"])
@@ -0,0 +1,153 @@
+import http.client
+import http.server
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+from types import SimpleNamespace
+from unittest import mock
+from utils.util import Util
+from converters.converter import Converter
+from solcon_server import SolConServer, ConversionHandler
+from utils.json_backend import JsonBackend
+from utils.yaml_backend import YamlBackend
+
+
+def make_solcon():
+    # Only what the server reads from the SolCon
+    return SimpleNamespace(converter=Converter("{}config/config-esc.toml".format(Util.root)),
+                           args=SimpleNamespace(provider=None), result_cache=None,
+                           yaml=YamlBackend("auto"), json=JsonBackend("python"))
+
+
+class TestSolConServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.solcon = make_solcon()
+        with open("{}test-input.yaml".format(Util.root), "rb") as f:
+            cls.data = f.read()
+
+    def test_convert(self):
+        server = SolConServer(self.solcon)
+        sol6 = server.convert(self.data, True)
+        self.assertEqual(json.loads(sol6)["data"]["etsi-nfv-descriptors:nfv"]["vnfd"]["id"], "VNF-test")
+
+        sol1 = server.convert(sol6.encode("utf-8"), False)
+        self.assertIn("vdu1", self.solcon.yaml.load(sol1)["topology_template"]["node_templates"])
+
+    def test_submit(self):
+        server = SolConServer(self.solcon)
+        self.assertEqual(server.submit(self.data, True), server.convert(self.data, True))
+
+    def test_timeout(self):
+        server = SolConServer(self.solcon, jobs=1, timeout=0.1)
+        release = threading.Event()
+        calls = []
+
+        def convert(data, is_yaml, provider=None):
+            calls.append(data)
+            release.wait(5)
+            return "done"
+
+        with mock.patch.object(server, "convert", side_effect=convert):
+            with self.assertRaises(TimeoutError):
+                server.submit(b"first", True)
+            # Only one conversion runs at a time, so the second one waits, times out and is cancelled
+            with self.assertRaises(TimeoutError):
+                server.submit(b"second", True)
+            release.set()
+            server.executor.shutdown(wait=True)
+        self.assertEqual(calls, [b"first"])
+
+
+class TestConversionHandler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SolConServer(make_solcon())
+        cls.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ConversionHandler)
+        cls.httpd.solcon_server = cls.server
+        cls.thread = threading.Thread(target=cls.httpd.serve_forever, daemon=True)
+        cls.thread.start()
+        with open("{}test-input.yaml".format(Util.root), "rb") as f:
+            cls.data = f.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls.server.executor.shutdown(wait=True)
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=10)
+        try:
+            conn.request(method, path, body=body)
+            response = conn.getresponse()
+            return response.status, response.getheader("Content-Type"), response.read().decode("utf-8")
+        finally:
+            conn.close()
+
+    def test_tosca(self):
+        status, content_type, body = self.request("POST", "/tosca?provider=cisco", self.data)
+        self.assertEqual((status, content_type), (200, "application/json"))
+        self.assertEqual(json.loads(body)["data"]["etsi-nfv-descriptors:nfv"]["vnfd"]["id"], "VNF-test")
+
+    def test_routes(self):
+        self.assertEqual(self.request("GET", "/health")[0], 200)
+        self.assertEqual(self.request("GET", "/tosca")[0], 404)
+        self.assertEqual(self.request("POST", "/other", b"a: 1")[0], 404)
+        self.assertEqual(self.request("POST", "/tosca")[0], 400)
+
+    def test_failed(self):
+        self.assertEqual(self.request("POST", "/sol6", b"{}")[0], 422)
+
+    def test_timeout(self):
+        with mock.patch.object(self.server, "submit", side_effect=TimeoutError()):
+            self.assertEqual(self.request("POST", "/tosca", self.data)[0], 504)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost", timeout=10)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets aren't supported")
+class TestUnixSocket(unittest.TestCase):
+
+    def test_serve(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "solcon.sock")
+            # A socket left over from a previous run is replaced
+            open(path, "w").close()
+
+            server = SolConServer(make_solcon())
+            thread = threading.Thread(target=server.serve, kwargs={"socket_path": path}, daemon=True)
+            thread.start()
+            for _ in range(100):
+                if server.httpd is not None:
+                    break
+                time.sleep(0.05)
+
+            conn = UnixHTTPConnection(path)
+            try:
+                conn.request("GET", "/health")
+                response = conn.getresponse()
+                self.assertEqual((response.status, response.read()), (200, b"OK\n"))
+            finally:
+                conn.close()
+
+            server.httpd.shutdown()
+            thread.join(5)
+            # The socket is removed when the server stops
+            self.assertFalse(os.path.exists(path))
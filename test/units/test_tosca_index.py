@@ -0,0 +1,40 @@
+import unittest
+import yaml
+from utils.util import Util
+from utils.dict_utils import get_roots_from_filter
+from utils.tosca_index import ToscaIndex
+
+
+class TestToscaIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("{}test-input.yaml".format(Util.root)) as f:
+            cls.tosca_vnf = yaml.safe_load(f)
+        cls.index = ToscaIndex(cls.tosca_vnf)
+
+    def test_matches_full_scan(self):
+        self.assertTrue(self.index.by_type)
+        for t in self.index.by_type:
+            self.assertEqual(self.index.get_roots(t), get_roots_from_filter(self.tosca_vnf, "type", t))
+
+    def test_unknown_type(self):
+        self.assertEqual(self.index.get_roots("not.a.Type"), [])
+
+    def test_filters(self):
+        vdu = "cisco.nodes.nfv.Vdu.Compute"
+        self.assertEqual(get_roots_from_filter(self.tosca_vnf, "type", vdu, index=self.index,
+                                               parent_filter=["nothing"]), [])
+        self.assertEqual(get_roots_from_filter(self.tosca_vnf, "type", vdu, index=self.index,
+                                               user_filter=lambda x: True),
+                         get_roots_from_filter(self.tosca_vnf, "type", vdu))
+
+    def test_nested_types(self):
+        # An element stops the search for its own type, but not for the other types inside of it
+        tosca = {"node_templates": {
+            "a": {"properties": {"inner": {"type": "x"}}, "type": "x", "requirements": [{"type": "x"}, {"type": "y"}]},
+            "b": {"type": "y"}},
+            "policies": [{"p": {"type": "x"}}]}
+        index = ToscaIndex(tosca)
+        for t in ("x", "y"):
+            self.assertEqual(index.get_roots(t), get_roots_from_filter(tosca, "type", t))
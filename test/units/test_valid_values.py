@@ -0,0 +1,34 @@
+import unittest
+from utils.valid_values import ValidValues, valid_values
+
+
+class TestValidValues(unittest.TestCase):
+
+    def setUp(self):
+        self.options = ["ephemeral-storage", "root-storage", "swap-storage", "cisco-etsi-nfvo:volume-storage"]
+        self.table = ValidValues(self.options)
+
+    def test_exact(self):
+        self.assertEqual(self.table.match("Root_Storage"), "root-storage")
+        self.assertIsNone(self.table.match("root"))
+        self.assertIsNone(self.table.match("storage"))
+
+    def test_fuzzy(self):
+        # The first option it is a part of, or that is a part of it
+        self.assertEqual(self.table.match("root", fuzzy=True), "root-storage")
+        self.assertEqual(self.table.match("storage", fuzzy=True), "ephemeral-storage")
+        self.assertEqual(self.table.match("my-swap-storage-1", fuzzy=True), "swap-storage")
+        self.assertEqual(self.table.match("volume", fuzzy=True), "cisco-etsi-nfvo:volume-storage")
+        self.assertIsNone(self.table.match("disk", fuzzy=True))
+
+    def test_same_as_scan(self):
+        values = ["", "r", "ROOT", "swap_storage", "x-ephemeral-storage-y", "volume-storage", "nope"]
+        for val in values:
+            tmp_val = val.lower().replace("_", "-")
+            expected = next((opt for opt in self.options
+                             if tmp_val in opt.lower() or opt.lower() in tmp_val), None)
+            self.assertEqual(self.table.match(val, fuzzy=True), expected, val)
+
+    def test_shared(self):
+        self.assertIs(valid_values(self.options), valid_values(self.options))
+        self.assertIsNot(valid_values(self.options), valid_values(list(self.options)))
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from utils.watcher import Watcher
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.watcher = Watcher(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data, mtime=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_scan(self):
+        vnf = self.write("vnf.yaml", "a: 1\n", mtime=1)
+        self.write("notes.txt", "x")
+        self.assertEqual(self.watcher.scan(), [vnf])
+        self.assertEqual(self.watcher.scan(), [])
+
+        # Touched or saved again with the same contents
+        self.write("vnf.yaml", "a: 1\n", mtime=2)
+        self.assertEqual(self.watcher.scan(), [])
+
+        self.write("vnf.yaml", "a: 2\n", mtime=3)
+        self.assertEqual(self.watcher.scan(), [vnf])
+
+    def test_record(self):
+        self.watcher.scan()
+        out = self.write("vnf.json", "{}")
+        self.watcher.record(out)
+        self.assertEqual(self.watcher.scan(), [])
+
+    def test_removed(self):
+        vnf = self.write("vnf.yaml", "a: 1\n")
+        self.watcher.scan()
+        os.remove(vnf)
+        self.assertEqual(self.watcher.scan(), [])
+        self.write("vnf.yaml", "a: 1\n")
+        self.assertEqual(self.watcher.scan(), [vnf])
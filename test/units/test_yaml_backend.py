@@ -0,0 +1,26 @@
+import unittest
+from utils.util import Util
+from utils.yaml_backend import YamlBackend, libyaml_available
+
+
+class TestYamlBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("{}test-input.yaml".format(Util.root), "rb") as f:
+            cls.data = f.read()
+
+    def test_python(self):
+        self.assertEqual(YamlBackend("python").name, "python")
+
+    @unittest.skipUnless(libyaml_available(), "PyYAML was built without libyaml")
+    def test_same_as_python(self):
+        c, py = YamlBackend("c"), YamlBackend("python")
+        self.assertEqual(c.name, "c")
+        vnf = c.load(self.data)
+        self.assertEqual(vnf, py.load(self.data))
+        self.assertEqual(c.dump(vnf, default_flow_style=False), py.dump(vnf, default_flow_style=False))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            YamlBackend("java")
@@ -15,18 +15,16 @@ B_END = '}'
 
 class YangToDict:
 
-    file = None
-    grouping_required = True
-    lines = []
-    lines_used = []
-    cur_line = -1
-    dict_result = {}
-    # For every open bracket we append *something* to this, and every closing bracket pops one off
-    cur_elem = []
-
     def __init__(self, file=None, g_req=True):
         self.grouping_required = g_req
         self.file = file
+        # The parse state belongs to this instance, so several files can be parsed at once
+        self.lines = []
+        self.lines_used = []
+        self.cur_line = -1
+        self.dict_result = {}
+        # For every open bracket we append *something* to this, and every closing bracket pops one off
+        self.cur_elem = []
 
     def parse_yang(self):
         """
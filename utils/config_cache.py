@@ -0,0 +1,57 @@
+"""
+On-disk cache for compiled configs.
+
+Parsing the TOML configs and resolving all of their paths is done every run, even though the
+configs almost never change. The compiled result is pickled here, keyed by a hash of the TOML
+contents and the SolCon version, so a changed config or a new SolCon version gets a new entry.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+log = logging.getLogger(__name__)
+
+
+class ConfigCache:
+    def __init__(self, cache_dir, version):
+        self.cache_dir = cache_dir
+        self.version = version
+
+    def key(self, *config_texts):
+        h = hashlib.sha256(str(self.version).encode("utf-8"))
+        for text in config_texts:
+            h.update(b"\0")
+            h.update(text.encode("utf-8"))
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, "config-{}.pickle".format(key))
+
+    def load(self, key):
+        """
+        Return the cached variables for the key, or None if there aren't any
+        """
+        try:
+            with open(self.path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # A broken cache entry is just rebuilt
+            log.warning("Ignoring unreadable config cache {}: {}".format(self.path(key), e))
+            return None
+
+    def store(self, key, variables):
+        tmp = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first, so other processes never read a partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(variables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path(key))
+        except OSError as e:
+            log.warning("Could not write config cache to {}: {}".format(self.cache_dir, e))
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
@@ -1,23 +1,109 @@
+import functools
 import logging
 log = logging.getLogger(__name__)
 
 SPLIT_CHAR = ";"
 
 
+class Path(str):
+    """
+    A path string that is already split on SPLIT_CHAR, with the list indexes converted to ints.
+    It is still a str, so it can be used anywhere a path string is, but the dict utils use the
+    split keys directly instead of splitting the string on every call.
+    """
+    def __new__(cls, path):
+        self = super().__new__(cls, path)
+        self.keys = tuple(path.split(SPLIT_CHAR))
+        # The int index for the keys that are list indexes, None for the dict keys
+        self.indexes = tuple(int(k) if k.isdigit() else None for k in self.keys)
+        return self
+
+    @classmethod
+    def from_keys(cls, keys, indexes):
+        """
+        Make the Path of already split keys, with their list indexes
+        """
+        self = super().__new__(cls, SPLIT_CHAR.join(keys))
+        self.keys = tuple(keys)
+        self.indexes = tuple(indexes)
+        return self
+
+
+def compile_path(path):
+    """
+    Return the Path for the path string, the same paths are looked up over and over again during a
+    conversion, so the compiled paths are cached
+    """
+    if isinstance(path, Path):
+        return path
+    return _compile_path(path)
+
+
+@functools.lru_cache(maxsize=8192)
+def _compile_path(path):
+    return Path(path)
+
+
+class PathTemplate:
+    """
+    A path with '{}' placeholder keys, split once, with the positions of the placeholders known.
+    fill puts the values into the placeholders and gives the Path, without splitting it again.
+    """
+    def __init__(self, path):
+        self.path = compile_path(path)
+        # The placeholders are filled from the last one to the first
+        self.slots = tuple(i for i in reversed(range(len(self.path.keys))) if self.path.keys[i] == "{}")
+
+    def fill(self, values):
+        """
+        :param values: The values for the placeholders, starting at the last one. Placeholders
+        without a value are left as they are
+        """
+        if not self.slots:
+            return self.path
+        keys = list(self.path.keys)
+        indexes = list(self.path.indexes)
+        split = False
+        for slot, value in zip(self.slots, values):
+            key = "{}".format(value)
+            keys[slot] = key
+            if SPLIT_CHAR in key:
+                # The value adds keys of its own, so the path has to be split after all the
+                # placeholders are filled
+                split = True
+            else:
+                indexes[slot] = int(key) if key.isdigit() else None
+        if split:
+            return compile_path(SPLIT_CHAR.join(keys))
+        return Path.from_keys(keys, indexes)
+
+
+def compile_template(path):
+    """
+    Return the PathTemplate for the path string, cached like compile_path
+    """
+    return _compile_template(path)
+
+
+@functools.lru_cache(maxsize=8192)
+def _compile_template(path):
+    return PathTemplate(path)
+
+
 def get_path_value(path, cur_dict, must_exist=True, ensure_dict=False, no_msg=False):
     """
     topology_template.node_templates.vnf.properties.descriptor_id
     Pass in a path and a dict the path applies to and get the value of the key
     """
-    values = path.split(SPLIT_CHAR)
+    path = compile_path(path)
     cur_context = cur_dict
 
-    for val in values:
-        if val.isdigit() and not isinstance(cur_context, list):
+    for val, index in zip(path.keys, path.indexes):
+        if index is not None and not isinstance(cur_context, list):
             cur_context = [cur_context]
 
         if isinstance(cur_context, list):
-            if not val.isdigit():
+            if index is None:
                 # Check if all the elements are dicts, if so just merge them
                 merge = True
                 for item in cur_context:
@@ -33,9 +119,9 @@ def get_path_value(path, cur_dict, must_exist=True, ensure_dict=False, no_msg=Fa
         if cur_context is None:
             return _path_val_existant(must_exist, no_msg, val, path)
 
-        if val.isdigit():
+        if index is not None:
             try:
-                cur_context = cur_context[int(val)]
+                cur_context = cur_context[index]
             except IndexError:
                 if must_exist:
                     raise
@@ -69,11 +155,13 @@ def set_path_to(path, cur_dict, value, create_missing=False, list_elem=0):
     If a list is encountered and the current value is not a number, then the method will
     pick list_elem in the list and continue with that as the context.
     """
-    values = path.split(SPLIT_CHAR)
+    path = compile_path(path)
+    values = path.keys
+    indexes = path.indexes
     cur_context = cur_dict
     i = 0
     while i < len(values):
-        if values[i].isdigit() and not isinstance(cur_context, list):
+        if indexes[i] is not None and not isinstance(cur_context, list):
             # This does not convert the entry in the dict into a list, just the current value
             cur_context = [cur_context]
             # So, we need to set the new value explicitly
@@ -86,17 +174,17 @@ def set_path_to(path, cur_dict, value, create_missing=False, list_elem=0):
         # When we encounter a list, get the list_elem (default the first) and continue
         if isinstance(cur_context, list):
             # If our value is a list index
-            if values[i].isdigit():
+            if indexes[i] is not None:
                 if i == len(values) - 1:
                     try:
-                        cur_context[int(values[i])] = value
+                        cur_context[indexes[i]] = value
                     except IndexError:
-                        list_insert_padding(cur_context, int(values[i]), value)
+                        list_insert_padding(cur_context, indexes[i], value)
                 try:
-                    cur_context = cur_context[int(values[i])]
+                    cur_context = cur_context[indexes[i]]
                     i += 1
                 except IndexError:
-                    list_insert_padding(cur_context, int(values[i]), {})
+                    list_insert_padding(cur_context, indexes[i], {})
             else:
                 if cur_context:
                     cur_context = cur_context[list_elem]
@@ -110,7 +198,7 @@ def set_path_to(path, cur_dict, value, create_missing=False, list_elem=0):
                 if not cur_context[values[i]] and create_missing:
                     # Look ahead and see if we're going to be using this as a list next iteration
                     # If so, make it a list, otherwise make it a dict
-                    if values[i+1].isdigit():
+                    if indexes[i+1] is not None:
                         cur_context[values[i]] = []
                     else:
                         # Make sure we're not deleting an empty list
@@ -149,7 +237,8 @@ def list_insert_padding(lst, index, value):
 
 
 def get_roots_from_filter(cur_dict, child_key=None, child_value=None, parent_key=None,
-                          internal_call=False, agg=None, user_filter=None, parent_filter=None):
+                          internal_call=False, agg=None, user_filter=None, parent_filter=None,
+                          index=None):
     """
     We need to be able to get root elements based on some interior condition, for example:
 
@@ -159,8 +248,13 @@ def get_roots_from_filter(cur_dict, child_key=None, child_value=None, parent_key
     This method returns a single list of the elements that meet the conditions. It performs
     aggregation along the way and returns the aggregated list at the end of the recursion.
 
+    :param index: A ToscaIndex of cur_dict, used instead of walking the dict when filtering on the
+    key it indexes
     :return: A single list of dicts that satisfies the conditions
     """
+    if index is not None and not internal_call and child_key == index.key and child_value:
+        return _filter_roots(index.get_roots(child_value), user_filter, parent_filter)
+
     # Recursively search through the dict since it's a large nested dict of other dicts
     # and lists and values
     if agg is None:
@@ -226,16 +320,20 @@ def get_roots_from_filter(cur_dict, child_key=None, child_value=None, parent_key
     # If that is the case then return our aggregated list, since we need to give it back to the
     # calling point
     if not internal_call:
-        if user_filter:
-            kept = []
-            for a in agg:
-                if user_filter(a):
-                    kept.append(a)
-            agg = kept
-        # parent_filter is a list of acceptable values for the parent key
-        if parent_filter:
-            agg = [d for d in agg if get_dict_key(d) in parent_filter]
-        return agg
+        return _filter_roots(agg, user_filter, parent_filter)
+
+
+def _filter_roots(agg, user_filter, parent_filter):
+    if user_filter:
+        kept = []
+        for a in agg:
+            if user_filter(a):
+                kept.append(a)
+        agg = kept
+    # parent_filter is a list of acceptable values for the parent key
+    if parent_filter:
+        agg = [d for d in agg if get_dict_key(d) in parent_filter]
+    return agg
 
 
 def get_path_from_filter(cur_item, child_key, child_value):
@@ -294,35 +392,52 @@ def merge_list_of_dicts(lst):
     return final
 
 
-def remove_empty_from_dict(d):
-    def _handle_zero(val):
-        """
-        Python treats 0s as False. So return True if we want to keep it
-        We also want to be able to write false values
-        I'm starting to think this method isn't really worth it
-        """
-        if val is 0 or val is False:
-            return True
-        return val
-
+def remove_empty_from_dict(d, in_place=False):
+    """
+    Remove the empty values (None, '', empty dicts and lists) from the nested dicts and lists.
+    0 and False are kept, since we want to be able to write them.
+    Every value is only visited once, children are pruned before their parent checks if they are empty.
+    :param in_place: Prune the dicts and lists themselves instead of building new ones
+    """
     if type(d) is dict:
-        return dict((k, remove_empty_from_dict(v)) for k, v in d.items() if _handle_zero(v)
-                    and _handle_zero(remove_empty_from_dict(v)))
+        if in_place:
+            for k in list(d):
+                v = remove_empty_from_dict(d[k], in_place)
+                if _keep_value(v):
+                    d[k] = v
+                else:
+                    del d[k]
+            return d
+        pruned = {}
+        for k, v in d.items():
+            v = remove_empty_from_dict(v)
+            if _keep_value(v):
+                pruned[k] = v
+        return pruned
     elif type(d) is list:
-        if d is [None]:  # Handle this stupid case, where we want to actually output this
+        pruned = [v for v in (remove_empty_from_dict(v, in_place) for v in d) if _keep_value(v)]
+        if in_place:
+            d[:] = pruned
             return d
-        return [remove_empty_from_dict(v) for v in d if _handle_zero(v) and
-                _handle_zero(remove_empty_from_dict(v))]
+        return pruned
     else:
         return d
 
 
+def _keep_value(val):
+    """
+    Python treats 0s as False. So return True if we want to keep it
+    """
+    if val is False or (type(val) is int and val == 0):
+        return True
+    return bool(val)
+
+
 def key_exists(item, path, strip_first=True):
     try:
         if strip_first:
             item = item[get_dict_key(item)]
-        paths = path.split(SPLIT_CHAR)
-        for p in paths:
+        for p in compile_path(path).keys:
             item = item[p]
     except KeyError:
         return False
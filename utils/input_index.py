@@ -0,0 +1,112 @@
+"""
+Index of the {get_input: NAME} values of a TOSCA dict.
+
+The inputs used to be found with get_roots_from_filter, which walks the whole dict, and were then
+only replaced one level under the elements it returned, so the inputs in lists or deeper down
+were left alone. The index walks the dict and its lists once and keeps where every input is, so
+replacing them is a single assignment each, and the ones that are left can be resolved later
+without searching for them again.
+"""
+import copy
+
+
+class InputIndex:
+    def __init__(self, dict_tosca, key="get_input"):
+        self.dict_tosca = dict_tosca
+        self.key = key
+        # input name -> [(container, key or list index)] of every place it is used, in document order
+        self.by_name = {}
+        # id of an input dict -> (input dict, name), to resolve the input dicts the mapping comes across
+        self._by_id = {}
+        self._walk(dict_tosca)
+
+    def substitute(self, values):
+        """
+        Replace every use of the inputs that have a value in values with that value
+        :return: The number of values that were replaced
+        """
+        count = 0
+        for name in [n for n in self.by_name if n in values]:
+            for container, key in self.by_name.pop(name):
+                self._by_id.pop(id(container[key]), None)
+                container[key] = values[name]
+                count += 1
+        return count
+
+    def specialize(self, values):
+        """
+        Copy dict_tosca with the inputs that have a value in values replaced, in a single walk.
+        The template itself is left alone, so it can be specialized again for the next values.
+        :return: The copy, and the InputIndex of the inputs that are left in it
+        """
+        index = InputIndex.__new__(InputIndex)
+        index.key = self.key
+        index.by_name = {}
+        index._by_id = {}
+        index.dict_tosca = index._copy(self.dict_tosca, values, {})
+        return index.dict_tosca, index
+
+    def name(self, item):
+        """
+        Return the input name of an {get_input: NAME} dict, or None if item isn't one
+        """
+        found = self._by_id.get(id(item))
+        if found is not None and found[0] is item:
+            return found[1]
+        # Not from this dict, i.e. a copy of it
+        if isinstance(item, dict) and self.key in item:
+            return item[self.key]
+        return None
+
+    def _walk(self, cur):
+        if isinstance(cur, dict):
+            items = cur.items()
+        elif isinstance(cur, list):
+            items = enumerate(cur)
+        else:
+            return
+
+        for key, value in items:
+            if isinstance(value, dict) and self.key in value and _hashable(value[self.key]):
+                name = value[self.key]
+                self.by_name.setdefault(name, []).append((cur, key))
+                self._by_id[id(value)] = (value, name)
+            else:
+                self._walk(value)
+
+    def _copy(self, cur, values, memo):
+        # memo keeps the values that the YAML anchors share, shared in the copy too
+        if id(cur) in memo:
+            return memo[id(cur)]
+        if isinstance(cur, dict):
+            copied = {}
+            items = cur.items()
+        elif isinstance(cur, list):
+            copied = [None] * len(cur)
+            items = enumerate(cur)
+        else:
+            # Scalars are shared with the template, nothing changes them in place
+            return cur
+        memo[id(cur)] = copied
+
+        for key, value in items:
+            if isinstance(value, dict) and self.key in value and _hashable(value[self.key]):
+                name = value[self.key]
+                if name in values:
+                    copied[key] = values[name]
+                    continue
+                value = copy.deepcopy(value, memo)
+                self.by_name.setdefault(name, []).append((copied, key))
+                self._by_id[id(value)] = (value, name)
+                copied[key] = value
+            else:
+                copied[key] = self._copy(value, values, memo)
+        return copied
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
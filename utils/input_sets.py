@@ -0,0 +1,70 @@
+"""
+Reading the sets of input values to convert a single TOSCA template with.
+
+    TOML: a table per set, the table name is the name of the set
+        [site-a]
+        VIM_FLAVOR = "small"
+
+    JSON: an object of named sets, or a list of sets
+        {"site-a": {"VIM_FLAVOR": "small"}}
+
+    CSV: a header row with the input names, then a set per row. The values are read as strings,
+         empty cells are left out, and a 'name' column names the set instead of being an input
+        name,VIM_FLAVOR
+        site-a,small
+
+Sets without a name are named after their position, starting at 1. The names are used in the
+output file names, so they can't be empty, '.' or '..', or have path separators in them.
+"""
+import csv
+import json
+import os
+import toml
+
+NAME_COLUMN = "name"
+
+
+def load_input_sets(file):
+    """
+    :return: A list of (name, {input name: value}) in the order of the file
+    """
+    ext = os.path.splitext(file)[1].lower()
+    if ext == ".csv":
+        with open(file, newline="") as f:
+            sets = [_csv_row(i, row) for i, row in enumerate(csv.DictReader(f))]
+    elif ext == ".toml":
+        with open(file) as f:
+            sets = _named_sets(toml.load(f))
+    elif ext == ".json":
+        with open(file) as f:
+            sets = _named_sets(json.load(f))
+    else:
+        raise ValueError("Unknown input sets format '{}', expected a .toml, .json or .csv file".format(file))
+
+    for name, values in sets:
+        if not isinstance(values, dict):
+            raise ValueError("Input set '{}' in {} is not a table of input values".format(name, file))
+        if not valid_name(name):
+            raise ValueError("Input set name '{}' in {} can't be used in a file name".format(name, file))
+    return sets
+
+
+def valid_name(name):
+    """
+    Return True if the name stays a single file name in the output directory
+    """
+    if name in ("", ".", ".."):
+        return False
+    return not any(c in name for c in ("/", "\\", "\0"))
+
+
+def _named_sets(loaded):
+    if isinstance(loaded, list):
+        return [(str(i + 1), values) for i, values in enumerate(loaded)]
+    return [(str(name), values) for name, values in loaded.items()]
+
+
+def _csv_row(i, row):
+    name = row.pop(NAME_COLUMN, None) or str(i + 1)
+    # An empty cell leaves the input to the config
+    return name, {k: v for k, v in row.items() if k is not None and v != ""}
@@ -0,0 +1,61 @@
+"""
+JSON writing, straight to the output file, with orjson when it is asked for and installed.
+
+The json module output is the reference, orjson writes the same for plain ASCII documents but
+leaves non-ASCII characters unescaped and formats some floats differently, so it is only used
+when it is selected.
+"""
+import json
+import logging
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ["python", "orjson"]
+
+
+class JsonBackend:
+    def __init__(self, backend="python", compact=False):
+        """
+        :param backend: 'python' for the json module, 'orjson' to use orjson if it is installed
+        :param compact: Leave out the indentation and the spaces between the elements
+        """
+        if backend not in BACKENDS:
+            raise ValueError("Unknown JSON backend '{}', valid backends: {}".format(backend, BACKENDS))
+        if backend == "orjson" and orjson is None:
+            log.warning("orjson is not installed, using the python JSON backend")
+            backend = "python"
+
+        self.name = backend
+        self.compact = compact
+        # orjson only writes bytes, so its output files have to be opened in binary mode
+        self.binary = backend == "orjson"
+
+    def dump(self, data, fp):
+        """
+        Write data to the file object fp, which has to be opened in binary mode if self.binary
+        """
+        if self.name == "orjson":
+            fp.write(self._orjson_dumps(data))
+        else:
+            # json.dump writes the encoded chunks as they are made, without building the whole string
+            json.dump(data, fp, **self._json_options())
+
+    def dumps(self, data):
+        if self.name == "orjson":
+            return self._orjson_dumps(data).decode("utf-8")
+        return json.dumps(data, **self._json_options())
+
+    def _json_options(self):
+        if self.compact:
+            return {"separators": (",", ":")}
+        return {"indent": 2}
+
+    def _orjson_dumps(self, data):
+        option = orjson.OPT_NON_STR_KEYS
+        if not self.compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
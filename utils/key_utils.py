@@ -1,9 +1,10 @@
-from utils.dict_utils import SPLIT_CHAR
+from utils.dict_utils import SPLIT_CHAR, compile_path
 
 
 class KeyUtils:
     """
     General utility methods to use on paths from this file
+    The paths can be strings or compiled Paths
 
     """
     @staticmethod
@@ -11,14 +12,14 @@ class KeyUtils:
         """
         Get the n last elements of the path, with their separators between them
         """
-        paths = path.split(SPLIT_CHAR)
+        paths = compile_path(path).keys
         if len(paths) > 0:
             return SPLIT_CHAR.join(paths[len(paths) - n:len(paths)])
         raise KeyError("Path {} is an invalid path to use in this method.".format(path))
 
     @staticmethod
     def get_path_index(path, index):
-        paths = path.split(SPLIT_CHAR)
+        paths = compile_path(path).keys
         if len(paths) >= index:
             return paths[index]
         raise KeyError("Path {} is an invalid path to use in this method.".format(path))
@@ -26,7 +27,7 @@ class KeyUtils:
     @staticmethod
     def remove_path_first(path, n=1):
         """ Get the string without the first n elements of the path """
-        paths = path.split(SPLIT_CHAR)
+        paths = compile_path(path).keys
         if len(paths) > 0:
             return SPLIT_CHAR.join(paths[n:len(paths)])
         raise KeyError("Path {} is an invalid path to use in this method.".format(path))
@@ -34,7 +35,7 @@ class KeyUtils:
     @staticmethod
     def remove_path_last(path, n=1):
         """ Get the string without the last n elements of the path """
-        paths = path.split(SPLIT_CHAR)
+        paths = compile_path(path).keys
         if len(paths) > 0:
             return SPLIT_CHAR.join(paths[:len(paths)-n])
         raise KeyError("Path {} is an invalid path to use in this method.".format(path))
@@ -48,10 +49,10 @@ class KeyUtils:
         """
         Remove the given elem of the path, return the path string without that element
         """
-        paths = path.split(SPLIT_CHAR)
+        paths = list(compile_path(path).keys)
         del paths[elem]
         return SPLIT_CHAR.join(paths)
 
     @staticmethod
     def get_path_level(path):
-        return path.count(SPLIT_CHAR) + 1
+        return len(compile_path(path).keys)
@@ -0,0 +1,120 @@
+"""
+Per phase timing and memory use of a conversion.
+
+    profiler = Profiler()
+    vnfd = converter.convert_tosca(tosca_vnf, profiler=profiler)
+    print(profiler.report())
+
+Every phase records its wall time and the peak memory allocated while it ran (with tracemalloc),
+phases that run more than once are added up. The report is a plain dict, so it can be written
+as a JSON line per converted file and aggregated afterwards.
+"""
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+
+
+class Profiler:
+    def __init__(self, name=None, trace_memory=True):
+        """
+        :param name: Included in the report, i.e. the converted file
+        :param trace_memory: Measure the peak memory of the phases, this slows the conversion down
+        """
+        self.name = name
+        self.trace_memory = trace_memory
+        # phase name -> {"seconds", "peak_bytes", "calls"}, in the order the phases first ran
+        self.phases = {}
+        # The peaks of the phases that are currently running, outermost first
+        self._peaks = []
+        self._started_tracing = False
+        self._start = None
+        self._end = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self):
+        self._end = time.perf_counter()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self._start is None:
+            self.start()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            self._fold_peak()
+            _reset_peak()
+        self._peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = self._peaks.pop()
+            if tracing:
+                peak = max(peak, tracemalloc.get_traced_memory()[1]) - base
+                # The outer phases were running too, so this peak counts for them as well
+                self._fold_peak()
+
+            stats = self.phases.setdefault(name, {"seconds": 0.0, "peak_bytes": 0, "calls": 0})
+            stats["seconds"] += seconds
+            stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+            stats["calls"] += 1
+
+    def _fold_peak(self):
+        """
+        Resetting the tracemalloc peak for a new phase would lose the peak of the running ones, so
+        keep it for them first
+        """
+        if self._peaks and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            self._peaks = [max(p, peak) for p in self._peaks]
+
+    def report(self):
+        end = self._end if self._end is not None else time.perf_counter()
+        total = end - self._start if self._start is not None else 0.0
+        return {
+            "name": self.name,
+            "total_seconds": round(total, 6),
+            "phases": {name: {"seconds": round(s["seconds"], 6), "peak_bytes": s["peak_bytes"],
+                              "calls": s["calls"]}
+                       for name, s in self.phases.items()}
+        }
+
+    def write(self, path):
+        """
+        Append the report as a single JSON line to path, or to stderr if path is '-'
+        """
+        line = json.dumps(self.report()) + "\n"
+        if path == "-":
+            sys.stderr.write(line)
+        else:
+            with open(path, "a") as f:
+                f.write(line)
+
+
+def _reset_peak():
+    # Only on Python 3.9+, before that the peaks are measured from the start of the tracing
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+class NoProfiler:
+    """
+    Stands in for a Profiler when nothing is profiled, the phases cost nothing
+    """
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+
+NO_PROFILER = NoProfiler()
@@ -0,0 +1,127 @@
+"""
+On-disk cache of conversion results.
+
+The same packages are converted over and over again when pipelines re-run. The final output is
+stored here keyed by a hash of everything that decides it: the input bytes, the configs, the
+provider, the prune flag, the output format and the SolCon version. A hit is served without
+parsing or converting anything. The least recently used entries are removed once the cache
+grows over its size limit.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+
+class ResultCache:
+    def __init__(self, cache_dir, version, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param max_size: The size in bytes the cache is kept under
+        """
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_size = max_size
+
+    def key(self, data, config_digest, provider, prune, output_format):
+        """
+        :param data: The raw bytes of the input
+        :param config_digest: The digest of the configs, from Converter.config_digest
+        :param output_format: Anything else that changes the output bytes, i.e. 'yaml' or 'json-compact'
+        """
+        h = hashlib.sha256()
+        for part in (self.version, config_digest, provider, prune, output_format):
+            h.update(str(part).encode("utf-8"))
+            h.update(b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, "result-{}.out".format(key))
+
+    def lookup(self, key):
+        """
+        Return the path of the cached output for the key, or None if there isn't one.
+        A hit counts as a use for the eviction.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def load(self, key):
+        """
+        Return the cached output bytes for the key, or None if there aren't any
+        """
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key, data):
+        """
+        Store the output bytes for the key
+        """
+        self._store(key, lambda f: f.write(data))
+
+    def store_file(self, key, file):
+        """
+        Store the contents of an already written output file for the key
+        """
+        def copy(f):
+            with open(file, "rb") as src:
+                shutil.copyfileobj(src, f)
+        self._store(key, copy)
+
+    def _store(self, key, write):
+        tmp = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first, so other processes never read a partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, self.path(key))
+        except OSError as e:
+            log.warning("Could not write to the result cache {}: {}".format(self.cache_dir, e))
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is under max_size
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not (name.startswith("result-") and name.endswith(".out")):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                # Removed by another process in the meantime
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        if total <= self.max_size:
+            return
+        for _, size, name in sorted(entries):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
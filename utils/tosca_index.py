@@ -0,0 +1,50 @@
+"""
+Index of the elements of a TOSCA dict by their 'type'.
+
+V2Map looks up the VDUs, CPs, storage, policies and groups by their type, and every one of those
+lookups used to walk the entire TOSCA dict with get_roots_from_filter. The index walks it once
+and buckets every element with a type, so the lookups afterwards are a dict access.
+"""
+
+
+class ToscaIndex:
+    def __init__(self, dict_tosca, key="type"):
+        self.dict_tosca = dict_tosca
+        self.key = key
+        # type -> [(parent key, element)], in the order get_roots_from_filter finds them
+        self.by_type = {}
+        self._walk(dict_tosca, None, frozenset())
+
+    def get_roots(self, value):
+        """
+        Return what get_roots_from_filter(dict_tosca, key, value) returns, without walking the dict
+        """
+        return [{parent: elem} if parent else elem for parent, elem in self.by_type.get(value, [])]
+
+    def _walk(self, cur_dict, parent_key, stopped):
+        """
+        Mirror the walk of get_roots_from_filter for every type at once.
+        It stops looking in an element as soon as it reaches a matching 'type' key, so the keys after
+        that are only searched for the other types, which is tracked with the stopped set.
+        """
+        if not isinstance(cur_dict, dict):
+            return
+
+        for key, value in cur_dict.items():
+            if key == self.key and value and _hashable(value) and value not in stopped:
+                self.by_type.setdefault(value, []).append((parent_key, cur_dict))
+                stopped = stopped | {value}
+
+            if isinstance(value, list):
+                for elem in value:
+                    self._walk(elem, None, stopped)
+            elif isinstance(value, dict):
+                self._walk(value, key, stopped)
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
@@ -0,0 +1,73 @@
+"""
+Lookup tables of the lists of valid values in the config, i.e. VALID_PROTOCOLS_VAL.
+
+A value used to be matched by scanning the list and lowercasing every option for every value.
+The table lowercases the options once into a dict for the exact matches, and keeps every
+substring of the options for the fuzzy matches, so a value is matched with a few lookups.
+The tables are made once per list and shared by every converter using the same config.
+
+A value matches the first option that is equal to it, case insensitive and with '_' read as '-',
+or with fuzzy, the first option that it is a part of or that is a part of it.
+"""
+
+
+class ValidValues:
+    def __init__(self, options):
+        self.options = options
+        # lowercase option -> index of the first option
+        self.exact = {}
+        # substring of a lowercase option -> index of the first option containing it
+        self.contains = {}
+        # lowercase value -> index of the option it fuzzy matched, or None
+        self._fuzzy = {}
+
+        for i, opt in enumerate(options):
+            lower = opt.lower()
+            self.exact.setdefault(lower, i)
+            for sub in _substrings(lower):
+                self.contains.setdefault(sub, i)
+
+    def match(self, val, fuzzy=False):
+        """
+        Return the option val matches, or None if it doesn't match any
+        :param val: A string
+        """
+        val = val.lower().replace("_", "-")
+        if fuzzy:
+            i = self._fuzzy.get(val, -1)
+            if i == -1:
+                i = self._find_fuzzy(val)
+                self._fuzzy[val] = i
+        else:
+            i = self.exact.get(val)
+        return None if i is None else str(self.options[i])
+
+    def _find_fuzzy(self, val):
+        # The first option val is a part of, or that is a part of val
+        found = [self.contains.get(val)]
+        found.extend(self.exact.get(sub) for sub in _substrings(val))
+        found = [i for i in found if i is not None]
+        return min(found) if found else None
+
+
+def _substrings(s):
+    yield ""
+    for start in range(len(s)):
+        for end in range(start + 1, len(s) + 1):
+            yield s[start:end]
+
+
+# id of a list of options -> (the list, its ValidValues)
+_tables = {}
+
+
+def valid_values(options):
+    """
+    Return the ValidValues of the list of options, made the first time the list is seen.
+    The lists are the ones from the config, they aren't changed once it is loaded.
+    """
+    found = _tables.get(id(options))
+    if found is None or found[0] is not options:
+        found = (options, ValidValues(options))
+        _tables[id(options)] = found
+    return found[1]
@@ -0,0 +1,101 @@
+"""
+Polls a directory for files whose contents changed.
+
+    watcher = Watcher("vnfs/")
+    for files in watcher.changes():
+        for file in files:
+            convert(file)
+
+Only the size and mtime of every file are checked on each poll, a file is read and hashed when
+those changed, and reported when its hash is different from the last one seen. Saving a file
+without changing it, or touching it, does not report it again.
+"""
+import hashlib
+import logging
+import os
+import time
+log = logging.getLogger(__name__)
+
+
+class Watcher:
+    def __init__(self, directory, extensions=("yaml", "json"), interval=0.5):
+        """
+        :param extensions: Only the files directly in the directory with these extensions are watched
+        :param interval: Seconds between the polls
+        """
+        self.directory = directory
+        self.extensions = extensions
+        self.interval = interval
+        # path -> (mtime_ns, size) and path -> sha256 of the contents, as last seen
+        self.stats = {}
+        self.hashes = {}
+
+    def files(self):
+        return sorted(os.path.join(self.directory, f) for f in os.listdir(self.directory)
+                      if f.split(".")[-1].lower() in self.extensions)
+
+    def scan(self):
+        """
+        Return the files that are new or whose contents changed since the last scan
+        """
+        changed = []
+        seen = set()
+        for path in self.files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed in the meantime
+                continue
+            seen.add(path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            if self.stats.get(path) == key:
+                continue
+            self.stats[path] = key
+
+            digest = self.digest(path)
+            if digest is not None and digest != self.hashes.get(path):
+                self.hashes[path] = digest
+                changed.append(path)
+
+        for path in set(self.stats) - seen:
+            del self.stats[path]
+            self.hashes.pop(path, None)
+        return changed
+
+    def record(self, path):
+        """
+        Take the current contents of the path as seen, i.e. for a file that was just written by the
+        caller, so it isn't reported as changed
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self.stats[path] = (stat.st_mtime_ns, stat.st_size)
+        digest = self.digest(path)
+        if digest is not None:
+            self.hashes[path] = digest
+
+    def changes(self):
+        """
+        Yield the list of changed files after every poll that found some, until interrupted.
+        The files that are there when it starts are taken as seen.
+        """
+        self.scan()
+        while True:
+            time.sleep(self.interval)
+            changed = self.scan()
+            if changed:
+                yield changed
+
+    @staticmethod
+    def digest(path):
+        h = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        except OSError as e:
+            log.warning("Could not read {}: {}".format(path, e))
+            return None
+        return h.hexdigest()
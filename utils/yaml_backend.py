@@ -0,0 +1,40 @@
+"""
+YAML loading and dumping, with libyaml when PyYAML was built with it.
+
+The pure Python parser is the largest single cost of converting a big TOSCA file. The libyaml
+loader builds the same dicts and the libyaml dumper writes the same text, so the C backend is
+used whenever it is available, unless the python one is asked for.
+"""
+import logging
+import yaml
+log = logging.getLogger(__name__)
+
+BACKENDS = ["auto", "c", "python"]
+
+
+def libyaml_available():
+    return hasattr(yaml, "CSafeLoader") and hasattr(yaml, "CDumper")
+
+
+class YamlBackend:
+    def __init__(self, backend="auto"):
+        """
+        :param backend: 'c' for libyaml, 'python' for the pure Python implementation, or 'auto' to
+        use libyaml if it is available
+        """
+        if backend not in BACKENDS:
+            raise ValueError("Unknown YAML backend '{}', valid backends: {}".format(backend, BACKENDS))
+        if backend == "c" and not libyaml_available():
+            log.warning("PyYAML was built without libyaml, using the python YAML backend")
+
+        use_c = backend != "python" and libyaml_available()
+        self.name = "c" if use_c else "python"
+        self.loader = yaml.CSafeLoader if use_c else yaml.SafeLoader
+        # yaml.dump uses the full Dumper, so keep its libyaml twin to write the same output
+        self.dumper = yaml.CDumper if use_c else yaml.Dumper
+
+    def load(self, data):
+        return yaml.load(data, Loader=self.loader)
+
+    def dump(self, data, **kwargs):
+        return yaml.dump(data, Dumper=self.dumper, **kwargs)